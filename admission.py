@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Admission control for submission grading
+
+Every submission token gets a rate limit (a token bucket refilled at a
+fixed number of submissions per minute, with a small burst allowance) and
+a limit on how many of its submissions may be in flight at once.
+
+Admitted submissions then queue for one of a fixed number of grading
+slots. The queue is bounded. When it is full, or a submission has waited
+longer than the maximum wait, the submission is rejected immediately with
+a suggested retry delay. Clients are turned away quickly instead of piling
+up lint and Dredd work until the server runs out of memory.
+
+Queue depth, wait times and rejection counts are kept for the metrics
+endpoint.
+"""
+
+import contextlib
+import math
+import threading
+import time
+from collections import deque
+
+
+class AdmissionRejected(Exception):
+    """Raised when a submission is not admitted; `retry_after` is a suggested delay in seconds"""
+
+    def __init__(self, reason, message, retry_after):
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(message)
+
+
+class _TokenState:
+    """Rate-limit bucket and in-flight count of one submission token"""
+
+    def __init__(self, burst, now):
+        self.allowance = burst
+        self.updated_at = now
+        self.in_flight = 0
+
+
+class AdmissionController:
+    """Per-token rate and concurrency limits in front of a bounded queue of grading slots"""
+
+    def __init__(self, max_active=8, max_queue=32, max_wait=30, token_rate=12, token_burst=6,
+                 token_concurrency=2, wait_samples=200):
+        """
+        Args:
+            max_active (int): Submissions graded at once
+            max_queue (int): Submissions that may wait for a grading slot
+            max_wait (float): Seconds a submission may wait before it is rejected
+            token_rate (float): Submissions per minute each token may make (0 disables the limit)
+            token_burst (int): Submissions a token may make back to back before the rate applies
+            token_concurrency (int): Submissions per token in flight at once (0 disables the limit)
+            wait_samples (int): Recent queue wait times kept for the percentiles
+        """
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.token_rate = token_rate / 60
+        self.token_burst = token_burst
+        self.token_concurrency = token_concurrency
+
+        self._active = 0
+        self._waiting = 0
+        self._tokens = {}
+        self._condition = threading.Condition()
+
+        self._admitted = 0
+        self._rejected = {}
+        self._waits = deque(maxlen=wait_samples)
+        self._max_wait_seen = 0.0
+        self._service_ewma = None
+
+    def reject(self, reason, message, retry_after):
+        """Count a rejection and return the AdmissionRejected to raise for it"""
+        with self._condition:
+            self._rejected[reason] = self._rejected.get(reason, 0) + 1
+        return AdmissionRejected(reason, message, retry_after)
+
+    def _service_time(self):
+        """Recent average seconds a submission holds a grading slot"""
+        return self._service_ewma if self._service_ewma is not None else 1.0
+
+    def _prune_tokens(self, now):
+        """Forget idle tokens whose bucket has refilled completely"""
+        if not self.token_rate:
+            idle = [token for token, state in self._tokens.items() if not state.in_flight]
+        else:
+            refill = self.token_burst / self.token_rate
+            idle = [token for token, state in self._tokens.items()
+                    if not state.in_flight and now - state.updated_at >= refill]
+        for token in idle:
+            del self._tokens[token]
+
+    def admit_token(self, token):
+        """
+        Apply the token's rate and concurrency limits and count a submission in flight for it.
+
+        Every admitted token must be released with release_token.
+
+        Raises:
+            AdmissionRejected: If the token is over either limit
+        """
+        now = time.monotonic()
+        with self._condition:
+            if len(self._tokens) > 1024:
+                self._prune_tokens(now)
+            state = self._tokens.get(token)
+            if state is None:
+                state = self._tokens[token] = _TokenState(self.token_burst, now)
+
+            if self.token_concurrency and state.in_flight >= self.token_concurrency:
+                raise self.reject('token_concurrency',
+                                  "Too many submissions in progress for this token, please wait for them to finish",
+                                  self._service_time())
+
+            if self.token_rate:
+                state.allowance = min(self.token_burst,
+                                      state.allowance + (now - state.updated_at) * self.token_rate)
+                state.updated_at = now
+                if state.allowance < 1:
+                    raise self.reject('token_rate',
+                                      "Too many submissions for this token, please slow down",
+                                      (1 - state.allowance) / self.token_rate)
+                state.allowance -= 1
+
+            state.in_flight += 1
+
+    def release_token(self, token):
+        """Count one of the token's submissions as finished"""
+        with self._condition:
+            state = self._tokens.get(token)
+            if state is not None:
+                state.in_flight = max(0, state.in_flight - 1)
+
+    def acquire_slot(self):
+        """
+        Wait in the bounded queue for a grading slot.
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait timed out
+        """
+        started = time.monotonic()
+        with self._condition:
+            if self._active >= self.max_active:
+                if self._waiting >= self.max_queue:
+                    raise self.reject('queue_full', "Too many submissions are being graded, please try again shortly",
+                                      (self._waiting + 1) * self._service_time() / self.max_active)
+
+                self._waiting += 1
+                try:
+                    deadline = started + self.max_wait
+                    while self._active >= self.max_active:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise self.reject('queue_timeout',
+                                              "Timed out waiting for a grading slot, please try again shortly",
+                                              self._waiting * self._service_time() / self.max_active)
+                        self._condition.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+            self._active += 1
+            self._admitted += 1
+            waited = time.monotonic() - started
+            self._waits.append(waited)
+            self._max_wait_seen = max(self._max_wait_seen, waited)
+            return waited
+
+    def release_slot(self, service_time=None):
+        """Give a grading slot back, recording how long it was held"""
+        with self._condition:
+            self._active -= 1
+            if service_time is not None:
+                if self._service_ewma is None:
+                    self._service_ewma = service_time
+                else:
+                    self._service_ewma += 0.2 * (service_time - self._service_ewma)
+            self._condition.notify()
+
+    @contextlib.contextmanager
+    def grading_slot(self):
+        """Hold a grading slot for the duration of a `with` block"""
+        self.acquire_slot()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release_slot(time.monotonic() - started)
+
+    def stats(self):
+        """Return queue depth, wait times and admission counts as a plain dictionary"""
+        with self._condition:
+            waits = sorted(self._waits)
+
+            def percentile(fraction):
+                if not waits:
+                    return None
+                return waits[min(len(waits) - 1, int(fraction * len(waits)))]
+
+            return {
+                'active': self._active,
+                'max_active': self.max_active,
+                'queue_depth': self._waiting,
+                'max_queue': self.max_queue,
+                'tokens_tracked': len(self._tokens),
+                'admitted': self._admitted,
+                'rejected': dict(self._rejected),
+                'wait_p50': percentile(0.5),
+                'wait_p95': percentile(0.95),
+                'wait_max': self._max_wait_seen,
+                'service_time_ewma': self._service_ewma
+            }
@@ -1,6 +1,6 @@
-import sqlite3
 from datetime import datetime
 import pytz
+from sqlite_tuning import connect
 
 # Define the path to your SQLite database
 DATABASE_PATH = "instance/submissions.db"
@@ -12,8 +12,8 @@ def close_expired_assignments():
     # Get the current time in EST
     now_est = datetime.now(EST).strftime("%Y-%m-%d %H:%M:%S")
 
-    # Connect to the SQLite database
-    conn = sqlite3.connect(DATABASE_PATH)
+    # Connect to the SQLite database with the shared PRAGMA profile
+    conn = connect(DATABASE_PATH)
     cursor = conn.cursor()
 
     # Update assignments that are past due and still open
@@ -8,105 +8,57 @@ and get top students for historic preservation during semester reset.
 
 from datetime import datetime
 from sqlalchemy import func
-from pc_flask_middleware import db, Student, Submission, Assignment
+from pc_flask_middleware import db, Student, Submission, Assignment, LatestSubmission, latest_submissions_query, rank_all_latest_submissions
+from ranking import rank_submissions
 
 
-def rank_score(value, sorted_values):
-    """Assign a score between 0 and 1 based on rank"""
-    if len(sorted_values) == 1:
-        return 1.0
-    rank = sorted_values.index(value)
-    return 1 - (rank / (len(sorted_values) - 1))
+def _new_totals():
+    """Start an empty set of running totals for one student"""
+    return {
+        'total_score': 0,
+        'exercises_completed': 0,
+        'challenges_completed': 0,
+        'total_runtime': 0,
+        'total_submission_time_rank': 0,
+        'total_lint_errors': 0,
+        'total_lines_of_code': 0
+    }
 
 
-def calculate_student_performance_data(student_anonymous_id):
-    """
-    Calculate performance data for a specific student based on their submissions.
+def _add_ranked_submission(totals, ranked):
+    """Add one ranked latest submission to a student's running totals"""
+    submission = ranked['submission']
     
-    Args:
-        student_anonymous_id (str): The student's anonymous ID
-        
-    Returns:
-        dict: Performance data including scores, counts, and averages
-    """
-    # Get all submissions for this student
-    submissions = Submission.query.filter_by(student_id=student_anonymous_id).all()
+    if 'exercise' in submission.assignment:
+        totals['exercises_completed'] += 1
+    else:
+        totals['challenges_completed'] += 1
     
-    if not submissions:
-        return None
+    totals['total_score'] += ranked['weighted_score']
+    totals['total_runtime'] += submission.runtime
+    totals['total_submission_time_rank'] += ranked['time_score']
+    totals['total_lint_errors'] += submission.lint_errors
     
-    # Get all assignments this student has submitted to
-    student_assignments = db.session.query(Submission.assignment).filter_by(
-        student_id=student_anonymous_id
-    ).distinct().all()
-    student_assignments = [a[0] for a in student_assignments]
-    
-    total_score = 0
-    exercises_completed = 0
-    challenges_completed = 0
-    total_runtime = 0
-    total_submission_time_rank = 0
-    total_lint_errors = 0
-    total_lines_of_code = 0
+    if submission.lines_of_code:
+        totals['total_lines_of_code'] += submission.lines_of_code
+    else:
+        totals['total_lines_of_code'] += -1
+
+
+def _performance_from_totals(totals):
+    """Turn a student's running totals into averages and tags"""
+    total_score = totals['total_score']
+    exercises_completed = totals['exercises_completed']
+    challenges_completed = totals['challenges_completed']
     tags = []
     
-    # Calculate performance for each assignment
-    for assignment in student_assignments:
-        # Get the student's latest submission for this assignment
-        latest_submission = db.session.query(Submission).filter_by(
-            student_id=student_anonymous_id,
-            assignment=assignment
-        ).order_by(Submission.submission_time.desc()).first()
-        
-        if not latest_submission:
-            continue
-        
-        # Get all submissions for this assignment to calculate ranks
-        assignment_submissions = Submission.query.filter_by(assignment=assignment).all()
-        
-        if not assignment_submissions:
-            continue
-        
-        # Calculate ranks
-        sorted_runtimes = sorted(s.runtime for s in assignment_submissions)
-        sorted_submission_times = sorted(s.submission_time.timestamp() for s in assignment_submissions)
-        sorted_lint_errors = sorted(s.lint_errors for s in assignment_submissions)
-        
-        runtime_rank = rank_score(latest_submission.runtime, sorted_runtimes)
-        time_rank = rank_score(latest_submission.submission_time.timestamp(), sorted_submission_times)
-        lint_rank = rank_score(latest_submission.lint_errors, sorted_lint_errors)
-        code_score = latest_submission.code_score / 100
-        
-        weighted_score = (
-            0.4 * runtime_rank +
-            0.3 * lint_rank +
-            0.2 * time_rank +
-            0.1 * code_score
-        )
-        
-        if 'exercise' in assignment:
-            weighted_score *= 0.25
-            exercises_completed += 1
-        else:
-            challenges_completed += 1
-        
-        total_score += weighted_score
-        total_runtime += latest_submission.runtime
-        total_submission_time_rank += time_rank
-        total_lint_errors += latest_submission.lint_errors
-        
-        if latest_submission.lines_of_code:
-            total_lines_of_code += latest_submission.lines_of_code
-        else:
-            total_lines_of_code += -1
-    
     # Calculate averages
     total_assignments = exercises_completed + challenges_completed
     if total_assignments > 0:
-        avg_runtime = total_runtime / total_assignments
-        avg_submission_time_rank = total_submission_time_rank / total_assignments
-        avg_lint_errors = total_lint_errors / total_assignments
-        avg_lines_of_code = total_lines_of_code / total_assignments
+        avg_runtime = totals['total_runtime'] / total_assignments
+        avg_submission_time_rank = totals['total_submission_time_rank'] / total_assignments
+        avg_lint_errors = totals['total_lint_errors'] / total_assignments
+        avg_lines_of_code = totals['total_lines_of_code'] / total_assignments
     else:
         avg_runtime = avg_submission_time_rank = avg_lint_errors = avg_lines_of_code = 0
     
@@ -134,6 +86,69 @@ def calculate_student_performance_data(student_anonymous_id):
     }
 
 
+def calculate_student_performance_data(student_anonymous_id):
+    """
+    Calculate performance data for a specific student based on their submissions.
+    
+    Args:
+        student_anonymous_id (str): The student's anonymous ID
+        
+    Returns:
+        dict: Performance data including scores, counts, and averages
+    """
+    # Get the student's latest submission for each assignment they submitted to
+    latest_submissions = latest_submissions_query().filter(
+        LatestSubmission.student_id == student_anonymous_id
+    ).all()
+    
+    if not latest_submissions:
+        return None
+    
+    totals = _new_totals()
+    
+    # Calculate performance for each assignment
+    for latest_submission in latest_submissions:
+        assignment = latest_submission.assignment
+        
+        # Rank against every student's latest submission, as the leaderboard does
+        assignment_submissions = latest_submissions_query().filter(
+            Submission.assignment == assignment
+        ).all()
+        
+        ranked = next(
+            r for r in rank_submissions(assignment_submissions, assignment)
+            if r['submission'].id == latest_submission.id
+        )
+        _add_ranked_submission(totals, ranked)
+    
+    return _performance_from_totals(totals)
+
+
+def calculate_all_student_performance_data():
+    """
+    Calculate performance data for every student with submissions in one pass.
+    
+    Each assignment's latest submissions are loaded and ranked once, instead
+    of once per student as repeated calculate_student_performance_data calls
+    would.
+    
+    Returns:
+        dict: Student anonymous ID -> performance data, in the same format as
+              calculate_student_performance_data
+    """
+    totals_by_student = {}
+    for ranked in rank_all_latest_submissions():
+        student_id = ranked['submission'].student_id
+        if student_id not in totals_by_student:
+            totals_by_student[student_id] = _new_totals()
+        _add_ranked_submission(totals_by_student[student_id], ranked)
+    
+    return {
+        student_id: _performance_from_totals(totals)
+        for student_id, totals in totals_by_student.items()
+    }
+
+
 def get_top_students_with_performance():
     """
     Get the top 3 students with their performance data calculated from submissions.
@@ -150,10 +165,12 @@ def get_top_students_with_performance():
     if not students_with_submissions:
         return []
     
-    # Calculate performance for each student
+    # Calculate performance for every student at once
+    performance_by_student = calculate_all_student_performance_data()
+    
     student_performance = []
     for student in students_with_submissions:
-        performance_data = calculate_student_performance_data(student.anonymous_id)
+        performance_data = performance_by_student.get(student.anonymous_id)
         if performance_data:
             student_performance.append({
                 'student': student,
@@ -164,4 +181,4 @@ def get_top_students_with_performance():
     student_performance.sort(key=lambda x: x['performance']['total_score'], reverse=True)
     top_students = student_performance[:3]
     
-    return top_students 
\ No newline at end of file
+    return top_students
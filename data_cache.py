@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Versioned result cache for expensive read paths
+
+Cached values are tagged with a global data version. Any write that can
+change what the leaderboard shows (a new submission, an admin edit, a
+profile preference change) calls bump_data_version(), which invalidates
+every cached value at once. An optional TTL bounds how long a value may be
+served for data that changes with the clock rather than with writes.
+
+The version lives in process memory, so each server process keeps its own
+cache and its own version.
+
+The single_flight decorator coalesces concurrent identical calls, so a burst
+of requests arriving together waits on one computation instead of each
+recomputing the same result.
+
+SnapshotHistory keeps the last few versions of a list of rows so clients can
+ask for only the rows that changed since the version they already have.
+
+LRUCache is a plain size-bounded cache for values that do not depend on the
+data version, such as grading results keyed on a file's content hash.
+"""
+
+import functools
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+_version = 0
+_version_lock = threading.Lock()
+
+# Distinguishes this process's versions from those of an earlier run
+_epoch = secrets.token_hex(4)
+
+
+def data_version():
+    """Return the current global data version"""
+    return _version
+
+
+def version_tag(*parts):
+    """
+    Build an opaque tag that changes whenever the data version does.
+
+    Extra parts (e.g. request parameters or the current date) are folded in
+    for responses that also depend on them. Suitable for use as an ETag.
+    """
+    return '-'.join([_epoch, str(_version)] + [str(part) for part in parts])
+
+
+def bump_data_version():
+    """Invalidate all cached values by advancing the global data version"""
+    global _version
+    with _version_lock:
+        _version += 1
+        return _version
+
+
+class VersionedCache:
+    """Cache of computed values that are valid for a single data version"""
+
+    def __init__(self, ttl=None):
+        """
+        Args:
+            ttl (float): Optional number of seconds after which a value is
+                         recomputed even if the data version has not changed
+        """
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """
+        Return the cached value for `key`, computing it if missing or stale.
+
+        Args:
+            key: Hashable cache key
+            compute (callable): Zero-argument function producing the value
+
+        Returns:
+            The cached or freshly computed value
+        """
+        version = data_version()
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            entry_version, expires_at, value = entry
+            if entry_version == version and (expires_at is None or now < expires_at):
+                return value
+
+        value = compute()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (version, expires_at, value)
+        return value
+
+    def clear(self):
+        """Drop every cached value"""
+        with self._lock:
+            self._entries.clear()
+
+
+class LRUCache:
+    """Size-bounded cache that evicts the least recently used entry"""
+
+    def __init__(self, max_entries=1024):
+        """
+        Args:
+            max_entries (int): Number of entries kept (0 disables the cache)
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value cached for `key`, or None if there is none"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Cache `value` under `key`, evicting the oldest entries past the size bound"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard_where(self, predicate):
+        """Drop every entry whose key satisfies `predicate` and return how many were dropped"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self):
+        """Drop every cached value"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return the size, bound and hit counts as a plain dictionary"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+class SnapshotHistory:
+    """Bounded history of row snapshots, used to compute deltas between versions"""
+
+    def __init__(self, key, max_versions=20):
+        """
+        Args:
+            key (str): Name of the field that identifies a row
+            max_versions (int): Number of past snapshots to keep
+        """
+        self.key = key
+        self.max_versions = max_versions
+        # Tokens from a previous server process must never match this one's
+        self._epoch = secrets.token_hex(4)
+        self._sequence = 0
+        self._snapshots = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, rows):
+        """
+        Record a snapshot of `rows` and return its version token.
+
+        If the rows are identical to the most recent snapshot, its token is
+        reused so clients are not told about changes that did not happen.
+        """
+        snapshot = {row[self.key]: row for row in rows}
+        with self._lock:
+            if self._snapshots:
+                latest_token = next(reversed(self._snapshots))
+                if self._snapshots[latest_token] == snapshot:
+                    return latest_token
+
+            self._sequence += 1
+            token = f"{self._epoch}.{self._sequence}"
+            self._snapshots[token] = snapshot
+            while len(self._snapshots) > self.max_versions:
+                self._snapshots.popitem(last=False)
+            return token
+
+    def delta(self, since, token):
+        """
+        Compare two recorded snapshots.
+
+        Args:
+            since (str): Version token the client already has
+            token (str): Current version token
+
+        Returns:
+            tuple: (changed rows, removed keys), or None if either snapshot
+                   is unknown and the client needs the full list
+        """
+        with self._lock:
+            old = self._snapshots.get(since)
+            new = self._snapshots.get(token)
+        if old is None or new is None:
+            return None
+
+        changed = [row for key, row in new.items() if old.get(key) != row]
+        removed = [key for key in old if key not in new]
+        return changed, removed
+
+
+class _Flight:
+    """A single in-progress computation that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def single_flight(func=None, key=None):
+    """
+    Decorator that shares one in-flight computation between concurrent callers.
+
+    While a call is running, other calls with the same key block until it
+    finishes and then receive its result (or re-raise its exception). Once the
+    call completes the next caller starts a fresh computation. Results are
+    shared between threads, so decorated functions should return plain data
+    rather than ORM objects bound to a session.
+
+    Can be used bare (@single_flight) or with a key function
+    (@single_flight(key=lambda *args, **kwargs: ...)). By default the key is
+    the call arguments. The data version is always part of the key, so a
+    call made after a write never joins a computation that started before it.
+    """
+    def decorator(func):
+        flights = {}
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if key is not None:
+                flight_key = (data_version(), key(*args, **kwargs))
+            else:
+                flight_key = (data_version(), args, tuple(sorted(kwargs.items())))
+
+            with lock:
+                flight = flights.get(flight_key)
+                is_leader = flight is None
+                if is_leader:
+                    flight = flights[flight_key] = _Flight()
+
+            if not is_leader:
+                flight.done.wait()
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result
+
+            try:
+                flight.result = func(*args, **kwargs)
+                return flight.result
+            except Exception as e:
+                flight.error = e
+                raise
+            finally:
+                with lock:
+                    del flights[flight_key]
+                flight.done.set()
+
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
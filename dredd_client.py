@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+HTTP client for the Dredd grading backends
+
+All submissions share one requests.Session, so connections to the backends
+are kept alive and reused instead of being opened for every submission.
+Every request has a connect and a read timeout, so a hung backend fails the
+attempt instead of holding the submission forever.
+
+Backends are tried in order. By default the next backend is only tried once
+the previous one has failed. In hedged mode the next backend is also fired
+when the previous one has not answered within a latency budget, and the
+first backend to answer wins.
+
+Backend URLs are templates with a {slug} placeholder for the Dredd endpoint
+('code' or 'debug'); the assignment name is appended to them.
+
+Each backend has a circuit breaker. Consecutive failures, or a high error
+rate over the recent requests, open its circuit. Submissions then go to the
+healthy backends first, and the failed backend is only used as a last
+resort. Once the circuit has been open for a while, a background probe
+checks whether the host answers again. The circuit is half-open while the
+probe runs and closes again when the probe succeeds.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class DreddUnavailable(Exception):
+    """Raised when no Dredd backend returned a usable response"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('; '.join(f"{url}: {error}" for url, error in errors))
+
+
+class BackendHealth:
+    """Rolling error rate, latency EWMA and circuit state of one Dredd backend"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, url, window=20, failure_threshold=3, error_rate_threshold=0.5,
+                 min_samples=10, reset_timeout=30, latency_alpha=0.2):
+        """
+        Args:
+            url (str): Backend URL template
+            window (int): Number of recent requests the error rate covers
+            failure_threshold (int): Consecutive failures that open the circuit
+            error_rate_threshold (float): Error rate over the window that opens the circuit
+            min_samples (int): Requests needed before the error rate is trusted
+            reset_timeout (float): Seconds the circuit stays open before probing
+            latency_alpha (float): Weight of the newest latency in the EWMA
+        """
+        self.url = url
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_samples = min_samples
+        self.reset_timeout = reset_timeout
+        self.latency_alpha = latency_alpha
+
+        self.state = self.CLOSED
+        self.latency_ewma = None
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record_success(self, latency=None):
+        """Record a request that got a usable answer, after `latency` seconds if it was a grading request"""
+        with self._lock:
+            self._outcomes.append(True)
+            self.consecutive_failures = 0
+            if latency is None:
+                pass
+            elif self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma += self.latency_alpha * (latency - self.latency_ewma)
+            self.state = self.CLOSED
+            self.opened_at = None
+
+    def record_failure(self, error):
+        """Record a failed request, opening the circuit if the backend looks down"""
+        with self._lock:
+            self._outcomes.append(False)
+            self.consecutive_failures += 1
+            self.last_error = str(error)
+
+            error_rate = self._outcomes.count(False) / len(self._outcomes)
+            if (self.state == self.HALF_OPEN
+                    or self.consecutive_failures >= self.failure_threshold
+                    or (len(self._outcomes) >= self.min_samples
+                        and error_rate >= self.error_rate_threshold)):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def is_available(self):
+        """Whether submissions should be routed to this backend ahead of others"""
+        with self._lock:
+            return self.state == self.CLOSED
+
+    def start_probe(self):
+        """Move an open circuit whose reset timeout has passed to half-open.
+
+        Returns:
+            bool: True if the caller should probe the backend now
+        """
+        with self._lock:
+            if self.state != self.OPEN or time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            return True
+
+    def snapshot(self):
+        """Return the health state as a plain dictionary"""
+        with self._lock:
+            outcomes = len(self._outcomes)
+            return {
+                'url': self.url,
+                'state': self.state,
+                'error_rate': self._outcomes.count(False) / outcomes if outcomes else 0.0,
+                'requests_in_window': outcomes,
+                'consecutive_failures': self.consecutive_failures,
+                'latency_ewma': self.latency_ewma,
+                'open_for': time.monotonic() - self.opened_at if self.opened_at is not None else None,
+                'last_error': self.last_error
+            }
+
+
+class DreddClient:
+    """Submit source files to the Dredd backends over pooled connections"""
+
+    def __init__(self, backends, connect_timeout=3.05, read_timeout=60, pool_size=10, hedge_after=None,
+                 **health_options):
+        """
+        Args:
+            backends (list): Backend URL templates, in order of preference
+            connect_timeout (float): Seconds to wait for a connection
+            read_timeout (float): Seconds to wait for the grading response
+            pool_size (int): Connections kept open per backend host
+            hedge_after (float): Seconds to wait for a backend before also
+                                 firing the next one, or None to only fall
+                                 back after a failure
+            **health_options: Circuit breaker settings passed to BackendHealth
+        """
+        self.backends = list(backends)
+        self.timeout = (connect_timeout, read_timeout)
+        self.hedge_after = hedge_after
+        self.health = {backend: BackendHealth(backend, **health_options) for backend in self.backends}
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(len(self.backends), 1), pool_maxsize=pool_size)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._pool_size = pool_size
+
+    def _post(self, backend, url, filename, source):
+        """Send one submission to one backend, record the outcome, and return (response JSON, status code)"""
+        health = self.health[backend]
+        started = time.monotonic()
+        try:
+            response = self._session.post(url, files={'source': (filename, source)}, timeout=self.timeout)
+            result = response.json(), response.status_code
+        except Exception as e:
+            health.record_failure(e)
+            raise
+        health.record_success(time.monotonic() - started)
+        return result
+
+    def _probe(self, backend):
+        """Check in the background whether a backend with an open circuit answers again"""
+        health = self.health[backend]
+        url = backend.format(slug='code')
+        try:
+            # Any HTTP answer means the host is reachable again
+            self._session.get(url, timeout=self.timeout)
+        except Exception as e:
+            print(f"Dredd backend probe failed: {url}: {e}")
+            health.record_failure(e)
+            return
+        print(f"Dredd backend probe succeeded: {url}")
+        health.record_success()
+
+    def ordered_backends(self):
+        """
+        Return the backends to try, healthy ones first, in configured order.
+
+        Backends whose circuit is open are kept at the end as a last resort.
+        Probes are started for those whose reset timeout has passed.
+        """
+        healthy = []
+        unhealthy = []
+        for backend in self.backends:
+            health = self.health[backend]
+            if health.is_available():
+                healthy.append(backend)
+            else:
+                unhealthy.append(backend)
+                if health.start_probe():
+                    threading.Thread(target=self._probe, args=(backend,), daemon=True).start()
+        return healthy + unhealthy
+
+    def health_report(self):
+        """Return the health of every backend, in configured order"""
+        return [self.health[backend].snapshot() for backend in self.backends]
+
+    def _hedge_executor(self):
+        """Return the thread pool used to run hedged requests, creating it on first use"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._pool_size, thread_name_prefix='dredd')
+            return self._executor
+
+    def submit(self, slug, assignment, filename, source):
+        """
+        Grade a source file with the first backend that answers.
+
+        Args:
+            slug (str): Dredd endpoint slug ('code' or 'debug')
+            assignment (str): Assignment name appended to the backend URL
+            filename (str): File name reported to Dredd
+            source (bytes): Contents of the source file
+
+        Returns:
+            tuple: (Dredd's JSON response, HTTP status code)
+
+        Raises:
+            DreddUnavailable: If every backend failed
+        """
+        targets = [(backend, backend.format(slug=slug) + assignment) for backend in self.ordered_backends()]
+        if self.hedge_after:
+            return self._submit_hedged(targets, filename, source)
+        return self._submit_sequential(targets, filename, source)
+
+    def _submit_sequential(self, targets, filename, source):
+        """Try each backend in turn until one answers"""
+        errors = []
+        for backend, url in targets:
+            try:
+                print(f"Trying Dredd backend: {url}")
+                result = self._post(backend, url, filename, source)
+                print(f"Dredd backend succeeded: {url}")
+                return result
+            except Exception as e:
+                print(f"Dredd backend failed: {url}: {e}")
+                errors.append((url, e))
+        raise DreddUnavailable(errors)
+
+    def _submit_hedged(self, targets, filename, source):
+        """Fire the next backend whenever the running ones are slow or fail, and take the first answer"""
+        executor = self._hedge_executor()
+        remaining = list(targets)
+        pending = {}
+        errors = []
+
+        def launch():
+            backend, url = remaining.pop(0)
+            print(f"Trying Dredd backend: {url}")
+            pending[executor.submit(self._post, backend, url, filename, source)] = url
+
+        launch()
+        while pending:
+            done, _ = wait(pending, timeout=self.hedge_after if remaining else None,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                # Nothing answered within the budget; hedge with the next backend
+                launch()
+                continue
+
+            for future in done:
+                url = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Dredd backend failed: {url}: {e}")
+                    errors.append((url, e))
+                    if remaining:
+                        launch()
+                    continue
+
+                # Requests still in flight finish on their own; their answers are discarded
+                print(f"Dredd backend succeeded: {url}")
+                return result
+
+        raise DreddUnavailable(errors)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Server-Sent Events broker for live leaderboard updates
+
+Write paths publish events here (a new submission, an admin change) and
+every connected /events stream receives them. Each subscriber gets its own
+bounded queue; a subscriber that falls too far behind simply misses
+messages; every event carries the current data version, so the next message
+that gets through still tells the client to refresh.
+"""
+
+import json
+import queue
+import threading
+
+
+def format_sse(event, data):
+    """Encode a single Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class EventBroker:
+    """Fan out published events to every subscribed stream"""
+
+    def __init__(self, max_queue_size=100):
+        self.max_queue_size = max_queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Register a new subscriber and return the queue it should read from"""
+        subscriber = queue.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Stop delivering events to a subscriber"""
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self):
+        """Return the number of connected subscribers"""
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event, data):
+        """Send an event to every subscriber without blocking the caller"""
+        message = format_sse(event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                pass
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Warm lint engine: a small pool of long-lived pylint/cpplint worker processes
+
+Running `python3 -m pylint` for every submission pays for interpreter
+startup, pylint's imports and astroid's bootstrap each time. The workers in
+this pool import pylint and cpplint once and then lint file after file
+in-process, invoking each linter exactly as its command line would and
+counting errors in its standard output the same way run_lint does.
+
+Each worker is this file run as a script, speaking one JSON line per job
+over its stdin/stdout. Jobs that take longer than the timeout kill their
+worker, and workers are replaced after a fixed number of jobs so memory
+held by astroid's caches does not grow without bound. Workers start lazily
+on the first job, so scripts that import the app never spawn them.
+
+A worker that cannot import a linter reports the job as unsupported and
+the caller falls back to the subprocess path.
+"""
+
+import atexit
+import contextlib
+import io
+import json
+import os
+import queue
+import re
+import select
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+
+class LintTimeout(Exception):
+    """Raised when a lint job does not finish within the engine's timeout"""
+
+
+def _run_main(main, argv):
+    """Run a linter's command-line entry point in-process and return what it writes to stdout"""
+    stdout = io.StringIO()
+    saved_argv = sys.argv
+    sys.argv = argv
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+            try:
+                main()
+            except SystemExit:
+                pass
+    finally:
+        sys.argv = saved_argv
+    return stdout.getvalue()
+
+
+def lint_file(file_path, pylint_main, cpplint_main):
+    """
+    Lint one file in-process, returning the same values as run_lint.
+
+    Args:
+        file_path (str): File to lint
+        pylint_main (callable): pylint's command-line entry point, or None if unavailable
+        cpplint_main (callable): cpplint's command-line entry point, or None if unavailable
+
+    Returns:
+        tuple: (lint errors, lint command, lines of code), or None if the
+               linter for this file type is unavailable
+    """
+    file_ext = Path(file_path).suffix
+    file_name = Path(file_path).name
+
+    if file_ext == '.py':
+        if pylint_main is None:
+            return None
+        main, lint_command = pylint_main, ['pylint']
+    elif file_ext in ['.c', '.cc', '.cpp']:
+        if cpplint_main is None:
+            return None
+        main, lint_command = cpplint_main, ['cpplint']
+    else:
+        return -1, [], -1
+
+    # Count the number of lines of code
+    with open(file_path, 'r') as file:
+        lines_of_code = sum(1 for line in file if line.strip())
+
+    output = _run_main(main, [lint_command[0], file_path])
+
+    if file_ext == '.py':
+        # Same as `grep -c -E <file name>` over pylint's output
+        pattern = re.compile(file_name)
+        lint_errors = sum(1 for line in output.splitlines() if pattern.search(line))
+    else:
+        # Count the number of lines in the output that contain the filename
+        lint_errors = sum(1 for line in output.splitlines() if file_name + ':' in line)
+
+    return lint_errors, lint_command, lines_of_code
+
+
+def serve():
+    """Worker loop: read a file path per line from stdin, answer with a JSON line on stdout"""
+    # Keep the real stdout for replies; anything else written to fd 1 goes to stderr
+    replies = os.fdopen(os.dup(1), 'w')
+    os.dup2(2, 1)
+
+    try:
+        import astroid
+        import pylint
+        pylint.modify_sys_path()
+        pylint_main = pylint.run_pylint
+        clear_cache = astroid.MANAGER.clear_cache
+    except ImportError:
+        pylint_main = None
+        clear_cache = None
+
+    try:
+        import cpplint
+        cpplint_main = cpplint.main
+    except ImportError:
+        cpplint_main = None
+
+    for line in sys.stdin:
+        file_path = json.loads(line)['path']
+        try:
+            result = lint_file(file_path, pylint_main, cpplint_main)
+            if result is None:
+                reply = {'unsupported': True}
+            else:
+                lint_errors, lint_command, lines_of_code = result
+                reply = {'lint_errors': lint_errors, 'lint_command': lint_command, 'lines_of_code': lines_of_code}
+        except Exception as e:
+            reply = {'error': f"{type(e).__name__}: {e}"}
+        finally:
+            # astroid caches modules by path; a later upload may reuse this file name with new content
+            if clear_cache is not None:
+                clear_cache()
+        replies.write(json.dumps(reply) + '\n')
+        replies.flush()
+
+
+class _LintWorker:
+    """Parent-side handle on one worker process"""
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
+        self.jobs = 0
+
+    def run(self, file_path, timeout):
+        """Send one job and wait up to `timeout` seconds for its reply"""
+        self.jobs += 1
+        self.process.stdin.write(json.dumps({'path': file_path}) + '\n')
+        self.process.stdin.flush()
+
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not ready:
+            raise LintTimeout(f"Lint did not finish within {timeout} seconds")
+
+        line = self.process.stdout.readline()
+        if not line:
+            raise RuntimeError("Lint worker exited unexpectedly")
+        return json.loads(line)
+
+    def kill(self):
+        """Kill the worker immediately, e.g. when it is stuck on a job"""
+        self.process.kill()
+        self.process.wait()
+
+    def stop(self):
+        """Ask the worker to exit, killing it if it does not"""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=1)
+        except Exception:
+            self.process.kill()
+            self.process.wait()
+
+
+class LintEngine:
+    """Pool of warm lint workers shared by all request threads"""
+
+    def __init__(self, workers=2, max_jobs=100, timeout=30):
+        """
+        Args:
+            workers (int): Number of worker processes
+            max_jobs (int): Jobs a worker runs before it is replaced
+            timeout (float): Seconds a job may take before its worker is killed
+        """
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        self._idle = queue.Queue()
+        for _ in range(workers):
+            # Placeholders; the worker process is started on first use
+            self._idle.put(None)
+        self._workers = set()
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _start_worker(self):
+        worker = _LintWorker()
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _retire_worker(self, worker, kill=False):
+        with self._lock:
+            self._workers.discard(worker)
+        if kill:
+            worker.kill()
+        else:
+            worker.stop()
+
+    def lint(self, file_path):
+        """
+        Lint a file on a warm worker.
+
+        Returns:
+            tuple: (lint errors, lint command, lines of code) as run_lint
+                   returns them, or None if the worker cannot lint this file type
+
+        Raises:
+            LintTimeout: If the job took longer than the timeout
+        """
+        worker = self._idle.get()
+        try:
+            if worker is None:
+                worker = self._start_worker()
+            reply = worker.run(file_path, self.timeout)
+        except Exception:
+            # The worker may be stuck mid-job; replace it with a fresh one on next use
+            if worker is not None:
+                self._retire_worker(worker, kill=True)
+            self._idle.put(None)
+            raise
+
+        if worker.jobs >= self.max_jobs:
+            self._retire_worker(worker)
+            worker = None
+        self._idle.put(worker)
+
+        if reply.get('unsupported'):
+            return None
+        if 'error' in reply:
+            raise RuntimeError(reply['error'])
+        return reply['lint_errors'], reply['lint_command'], reply['lines_of_code']
+
+    def close(self):
+        """Stop every worker process"""
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+
+if __name__ == '__main__':
+    serve()
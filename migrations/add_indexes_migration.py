@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Add hot-path indexes to the submission and student tables
+
+This migration creates the secondary indexes declared on the Submission and
+Student models. New databases get them from db.create_all(); databases
+created before the indexes were declared need this script.
+
+The query plans of the hot queries are printed before and after, so the
+full table scans they replace can be seen disappearing.
+
+Usage:
+    python migrations/add_indexes_migration.py
+
+This script is safe to run multiple times - it will only create the indexes
+that don't already exist.
+"""
+
+import os
+import sys
+from datetime import datetime
+
+# Add the parent directory to the path so we can import pc_flask_middleware
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pc_flask_middleware import app, db, Student, Submission
+
+# Representative hot queries, with sample parameters for EXPLAIN QUERY PLAN
+HOT_QUERIES = [
+    ("Assignment page",
+     "SELECT * FROM submission WHERE assignment = :assignment "
+     "ORDER BY submission_time DESC, id DESC LIMIT 100",
+     {'assignment': 'challenge01'}),
+    ("Latest submission lookup",
+     "SELECT * FROM submission WHERE assignment = :assignment AND student_id = :student_id "
+     "ORDER BY submission_time DESC LIMIT 1",
+     {'assignment': 'challenge01', 'student_id': 'abc123'}),
+    ("Student page",
+     "SELECT * FROM submission WHERE student_id = :student_id ORDER BY submission_time DESC",
+     {'student_id': 'abc123'}),
+    ("Recent submissions ticker",
+     "SELECT * FROM submission ORDER BY submission_time DESC LIMIT 5",
+     {}),
+    ("Submissions since a date",
+     "SELECT * FROM submission WHERE submission_time >= :start",
+     {'start': '2025-01-01 00:00:00'}),
+    ("Debug students",
+     "SELECT * FROM student WHERE debug = 1",
+     {}),
+    ("Students of a semester",
+     "SELECT * FROM student WHERE debug = 0 AND semester = :semester",
+     {'semester': 'fa25'}),
+]
+
+def check_index_exists(index_name):
+    """Check if an index exists in the database"""
+    with app.app_context():
+        with db.engine.connect() as conn:
+            result = conn.execute(
+                db.text("SELECT name FROM sqlite_master WHERE type = 'index' AND name = :name"),
+                {'name': index_name}
+            )
+            return result.first() is not None
+
+def print_query_plans():
+    """Print the query plan of every hot query, flagging full table scans"""
+    with app.app_context():
+        with db.engine.connect() as conn:
+            for label, sql, params in HOT_QUERIES:
+                plan = conn.execute(db.text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+                details = [row[-1] for row in plan]
+                full_scan = any(
+                    detail.startswith('SCAN') and 'USING' not in detail
+                    for detail in details
+                )
+                marker = "⚠️ " if full_scan else "✅"
+                print(f"  {marker} {label}:")
+                for detail in details:
+                    print(f"      {detail}")
+
+def add_indexes():
+    """Create every declared index on the submission and student tables that doesn't exist yet"""
+    with app.app_context():
+        created = 0
+        for model in (Submission, Student):
+            for index in model.__table__.indexes:
+                if check_index_exists(index.name):
+                    print(f"ℹ️  Index {index.name} already exists")
+                    continue
+
+                print(f"Creating index {index.name}...")
+                try:
+                    index.create(bind=db.engine)
+                    created += 1
+                except Exception as e:
+                    print(f"❌ Error creating index {index.name}: {e}")
+                    return False
+
+        with db.engine.connect() as conn:
+            # Refresh the planner statistics so the new indexes are used
+            conn.execute(db.text("ANALYZE"))
+            conn.commit()
+
+        print(f"✅ Created {created} indexes")
+        return True
+
+def verify_migration():
+    """Verify that every declared index now exists"""
+    missing = [
+        index.name
+        for model in (Submission, Student)
+        for index in model.__table__.indexes
+        if not check_index_exists(index.name)
+    ]
+
+    print(f"\nMigration Verification:")
+    if missing:
+        print(f"⚠️  Missing indexes: {', '.join(missing)}")
+        return False
+
+    print("✅ All declared indexes exist")
+    return True
+
+def main():
+    """Main migration function"""
+    print("=" * 60)
+    print("Database Migration: Add Hot-Path Indexes")
+    print("=" * 60)
+    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print()
+
+    # Step 1: Query plans before
+    print("Query plans before migration:")
+    print_query_plans()
+
+    print()
+
+    # Step 2: Create the indexes
+    if not add_indexes():
+        print("❌ Migration failed: Could not create indexes")
+        sys.exit(1)
+
+    print()
+
+    # Step 3: Query plans after
+    print("Query plans after migration:")
+    print_query_plans()
+
+    # Step 4: Verify migration
+    if not verify_migration():
+        sys.exit(1)
+
+    print()
+    print("=" * 60)
+    print("✅ Migration completed successfully!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
-from flask import Flask, request, render_template, jsonify, redirect, url_for, session, flash, send_file
+from flask import Flask, request, render_template, jsonify, redirect, url_for, session, flash, send_file, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import aliased
-from sqlalchemy.sql import func
+from sqlalchemy.orm import aliased, joinedload, contains_eager
+from sqlalchemy.sql import func, and_, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy import event, case
 from datetime import datetime, timezone
-import requests
 import json
 import os
 import secrets
@@ -18,13 +19,101 @@ import pytz
 from collections import defaultdict
 from datetime import timedelta
 import csv
+import io
 import re
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+from ranking import rank_submissions, ranked_submission, rank_from_percent_rank
+from data_cache import VersionedCache, SnapshotHistory, LRUCache, bump_data_version, data_version, version_tag, single_flight
+from events import EventBroker, format_sse
+from sqlite_tuning import sqlite_pragmas, apply_sqlite_pragmas
+from dredd_client import DreddClient, DreddUnavailable
+from lint_engine import LintEngine, LintTimeout
+from admission import AdmissionController, AdmissionRejected
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///submissions.db'
+# Relative SQLite paths live in the instance folder
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('SQLALCHEMY_DATABASE_URI', 'sqlite:///submissions.db')
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', 'default_secret_key')  # Use a secure key
+# PRAGMAs run on every new database connection (WAL, busy timeout, cache sizes; see sqlite_tuning.py)
+app.config['SQLITE_PRAGMAS'] = sqlite_pragmas()
+# Background grading for clients that send X-Async-Grading: worker threads, and jobs queued or running at once
+app.config['GRADING_WORKERS'] = int(os.environ.get('GRADING_WORKERS', 4))
+app.config['GRADING_QUEUE_SIZE'] = int(os.environ.get('GRADING_QUEUE_SIZE', 32))
+# Seconds clients are asked to wait between /jobs/<id> checks, and hours finished jobs are kept
+app.config['GRADING_JOB_POLL_INTERVAL'] = float(os.environ.get('GRADING_JOB_POLL_INTERVAL', 1))
+app.config['GRADING_JOB_RETENTION_HOURS'] = float(os.environ.get('GRADING_JOB_RETENTION_HOURS', 24))
+# Synchronous submissions graded at once, submissions that may queue for a slot, and seconds one may wait
+app.config['ADMISSION_MAX_ACTIVE'] = int(os.environ.get('ADMISSION_MAX_ACTIVE', 8))
+app.config['ADMISSION_QUEUE_SIZE'] = int(os.environ.get('ADMISSION_QUEUE_SIZE', 32))
+app.config['ADMISSION_MAX_WAIT'] = float(os.environ.get('ADMISSION_MAX_WAIT', 30))
+# Per submission token: submissions per minute, back-to-back burst, and submissions in flight (0 disables a limit)
+app.config['ADMISSION_TOKEN_RATE'] = float(os.environ.get('ADMISSION_TOKEN_RATE', 12))
+app.config['ADMISSION_TOKEN_BURST'] = int(os.environ.get('ADMISSION_TOKEN_BURST', 6))
+app.config['ADMISSION_TOKEN_CONCURRENCY'] = int(os.environ.get('ADMISSION_TOKEN_CONCURRENCY', 2))
+# Dredd backend URL templates in order of preference, comma separated; {slug} is 'code' or 'debug'
+app.config['DREDD_BACKENDS'] = [url.strip() for url in os.environ.get(
+    'DREDD_BACKENDS',
+    'https://solomon.williamtheisen.com/{slug}/,https://dredd.h4x0r.space/{slug}/cse-30872-fa24/'
+).split(',') if url.strip()]
+# Seconds to wait for a Dredd connection and for its grading response
+app.config['DREDD_CONNECT_TIMEOUT'] = float(os.environ.get('DREDD_CONNECT_TIMEOUT', 3.05))
+app.config['DREDD_READ_TIMEOUT'] = float(os.environ.get('DREDD_READ_TIMEOUT', 60))
+# Keep-alive connections per Dredd host
+app.config['DREDD_POOL_SIZE'] = int(os.environ.get('DREDD_POOL_SIZE', 10))
+# Seconds before also firing the next Dredd backend (0 only falls back after a failure)
+app.config['DREDD_HEDGE_AFTER'] = float(os.environ.get('DREDD_HEDGE_AFTER', 0))
+# Consecutive failures that open a Dredd backend's circuit, and seconds before it is probed again
+app.config['DREDD_FAILURE_THRESHOLD'] = int(os.environ.get('DREDD_FAILURE_THRESHOLD', 3))
+app.config['DREDD_RESET_TIMEOUT'] = float(os.environ.get('DREDD_RESET_TIMEOUT', 30))
+# Threads running lint alongside the Dredd request
+app.config['LINT_WORKERS'] = int(os.environ.get('LINT_WORKERS', 8))
+# 'warm' lints on long-lived pylint/cpplint workers (see lint_engine.py); 'subprocess' starts the linters per submission
+app.config['LINT_ENGINE'] = os.environ.get('LINT_ENGINE', 'warm')
+# Warm lint worker processes, jobs each runs before it is replaced, and seconds a job may take
+app.config['LINT_ENGINE_WORKERS'] = int(os.environ.get('LINT_ENGINE_WORKERS', 2))
+app.config['LINT_ENGINE_MAX_JOBS'] = int(os.environ.get('LINT_ENGINE_MAX_JOBS', 100))
+app.config['LINT_ENGINE_TIMEOUT'] = float(os.environ.get('LINT_ENGINE_TIMEOUT', 30))
+# Lint and Dredd results kept for byte-identical resubmissions (0 disables the cache)
+app.config['GRADING_CACHE_SIZE'] = int(os.environ.get('GRADING_CACHE_SIZE', 1024))
+# Uploads are held in memory up to this many bytes and spill to a temporary file beyond it
+app.config['UPLOAD_SPOOL_MAX_SIZE'] = int(os.environ.get('UPLOAD_SPOOL_MAX_SIZE', 1024 * 1024))
+# Directory for the short-lived files the linters read; tmpfs avoids disk writes (empty uses the system default)
+app.config['LINT_TEMP_DIR'] = os.environ.get('LINT_TEMP_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else '') or None
+# 'table' reads the LatestSubmission table; 'window' ranks everything in one SQL statement (SQLite >= 3.25)
+app.config['LEADERBOARD_QUERY_MODE'] = os.environ.get('LEADERBOARD_QUERY_MODE', 'table')
+# Seconds a cached leaderboard may be served before recomputing (0 disables expiry)
+app.config['LEADERBOARD_CACHE_TTL'] = float(os.environ.get('LEADERBOARD_CACHE_TTL', 300))
+# Seconds cached rank tables and navigation data may be served before recomputing (0 disables expiry)
+app.config['PAGE_CACHE_TTL'] = float(os.environ.get('PAGE_CACHE_TTL', 60))
+# Seconds between keep-alive comments on idle /events streams
+app.config['EVENTS_KEEPALIVE'] = float(os.environ.get('EVENTS_KEEPALIVE', 15))
+# Submissions shown per page on the assignment and submission browser pages, and the most a client may ask for
+app.config['ASSIGNMENT_PAGE_SIZE'] = int(os.environ.get('ASSIGNMENT_PAGE_SIZE', 100))
+app.config['ASSIGNMENT_MAX_PAGE_SIZE'] = int(os.environ.get('ASSIGNMENT_MAX_PAGE_SIZE', 500))
 db = SQLAlchemy(app)
 
+# Leaderboard results, invalidated whenever a write bumps the data version
+leaderboard_cache = VersionedCache(ttl=app.config['LEADERBOARD_CACHE_TTL'])
+
+# Per-assignment rank tables used by the student and assignment pages. Writes from other
+# processes and CLI scripts do not bump this process's data version, so entries also expire.
+rank_index_cache = VersionedCache(ttl=app.config['PAGE_CACHE_TTL'])
+
+# Student and assignment names for the navigation search box on every page
+navigation_cache = VersionedCache(ttl=app.config['PAGE_CACHE_TTL'])
+
+# Lint and Dredd results keyed on submission content; cleared per assignment by admins when tests change
+grading_cache = LRUCache(max_entries=app.config['GRADING_CACHE_SIZE'])
+
+# Recent leaderboard versions, so /leaderboard_data?since=<version> can send only changed rows
+leaderboard_history = SnapshotHistory(key='student_id')
+
+# Live updates pushed to leaderboard pages over /events
+event_broker = EventBroker()
+
 
 class AdminToken(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -39,6 +128,9 @@ class Student(db.Model):
     debug = db.Column(db.Boolean, default=False)  # New column for debug users
     semester = db.Column(db.String(20), nullable=True)  # Semester tag for historic students
 
+    # Leaderboard and ranking queries split students by debug flag and semester
+    __table_args__ = (db.Index('ix_student_debug_semester', 'debug', 'semester'),)
+
     # Define the relationship to Submissions
     submissions = db.relationship('Submission', back_populates='student', lazy=True)
 
@@ -53,6 +145,18 @@ class Submission(db.Model):
     submission_time = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     lines_of_code = db.Column(db.Integer, default=-1)  # New column for lines of code
 
+    # Existing databases get these from migrations/add_indexes_migration.py
+    __table_args__ = (
+        # Ranking and latest-submission lookups per student and assignment
+        db.Index('ix_submission_assignment_student_time', 'assignment', 'student_id', 'submission_time'),
+        # Assignment pages: keyset pagination newest first (the rowid breaks ties)
+        db.Index('ix_submission_assignment_time', 'assignment', 'submission_time'),
+        # Student pages: one student's submissions, newest first
+        db.Index('ix_submission_student_time', 'student_id', 'submission_time'),
+        # Recent submissions ticker, date ranges and the default /assignments sort
+        db.Index('ix_submission_submission_time', 'submission_time'),
+    )
+
     # Define the relationship back to Student
     student = db.relationship('Student', back_populates='submissions', primaryjoin="Submission.student_id == Student.anonymous_id")
 
@@ -93,9 +197,193 @@ class HistoricStudentPerformance(db.Model):
     # Relationship to Student
     student = db.relationship('Student', backref='historic_performance')
 
-# Create the database tables
-with app.app_context():
-    db.create_all()
+class LatestSubmission(db.Model):
+    """Most recent submission per student per assignment, maintained by proxy_code"""
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.String(8), db.ForeignKey('student.anonymous_id'), nullable=False)
+    assignment = db.Column(db.String(100), nullable=False)
+    submission_id = db.Column(db.Integer, db.ForeignKey('submission.id'), nullable=False)
+    submission_time = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (db.UniqueConstraint('student_id', 'assignment'),)
+
+    submission = db.relationship('Submission')
+
+def record_latest_submission(submission):
+    """Point the LatestSubmission row for this student/assignment at `submission`.
+
+    The submission must already be flushed so it has an id and a submission
+    time. The caller is responsible for committing.
+    """
+    # SQLite stores naive UTC datetimes, but a freshly flushed default is tz-aware
+    submission_time = submission.submission_time.replace(tzinfo=None)
+
+    latest = LatestSubmission.query.filter_by(
+        student_id=submission.student_id,
+        assignment=submission.assignment
+    ).first()
+
+    if latest is None:
+        db.session.add(LatestSubmission(
+            student_id=submission.student_id,
+            assignment=submission.assignment,
+            submission_id=submission.id,
+            submission_time=submission_time
+        ))
+    elif latest.submission_time <= submission_time:
+        latest.submission_id = submission.id
+        latest.submission_time = submission_time
+
+def rebuild_latest_submissions():
+    """Rebuild the LatestSubmission table from scratch out of the Submission table.
+
+    Returns:
+        int: Number of latest-submission rows written
+    """
+    latest = {}
+    rows = db.session.query(
+        Submission.id,
+        Submission.student_id,
+        Submission.assignment,
+        Submission.submission_time
+    ).order_by(Submission.submission_time, Submission.id)
+
+    # Later rows overwrite earlier ones, leaving the newest per student/assignment
+    for row in rows:
+        latest[(row.student_id, row.assignment)] = row
+
+    LatestSubmission.query.delete()
+    db.session.add_all(
+        LatestSubmission(
+            student_id=row.student_id,
+            assignment=row.assignment,
+            submission_id=row.id,
+            submission_time=row.submission_time
+        )
+        for row in latest.values()
+    )
+    db.session.commit()
+
+    return len(latest)
+
+class DailySubmissionStats(db.Model):
+    """Successful and failed submission counts per EST day, maintained by proxy_code"""
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, unique=True, nullable=False)
+    success = db.Column(db.Integer, nullable=False, default=0)
+    failure = db.Column(db.Integer, nullable=False, default=0)
+
+def record_daily_submission(submission):
+    """Count `submission` towards the DailySubmissionStats row of its EST day.
+
+    Uses a single upsert so concurrent submissions on the same day cannot
+    lose counts. The caller is responsible for committing.
+    """
+    date = convert_to_est(submission.submission_time).date()
+    success = 1 if is_success_status(submission.status) else 0
+
+    upsert = sqlite_insert(DailySubmissionStats).values(date=date, success=success, failure=1 - success)
+    db.session.execute(upsert.on_conflict_do_update(
+        index_elements=['date'],
+        set_={
+            'success': DailySubmissionStats.success + upsert.excluded.success,
+            'failure': DailySubmissionStats.failure + upsert.excluded.failure
+        }
+    ))
+
+def rebuild_daily_submission_stats():
+    """Rebuild the DailySubmissionStats table from scratch out of the Submission table.
+
+    Returns:
+        int: Number of days written
+    """
+    counts = defaultdict(lambda: {'success': 0, 'failure': 0})
+    for submission_time, status in db.session.query(Submission.submission_time, Submission.status):
+        date = convert_to_est(submission_time).date()
+        if is_success_status(status):
+            counts[date]['success'] += 1
+        else:
+            counts[date]['failure'] += 1
+
+    DailySubmissionStats.query.delete()
+    db.session.add_all(
+        DailySubmissionStats(date=date, success=day['success'], failure=day['failure'])
+        for date, day in counts.items()
+    )
+    db.session.commit()
+
+    return len(counts)
+
+class GradingJob(db.Model):
+    """A submission graded in the background, created by proxy_code in async mode"""
+    id = db.Column(db.String(32), primary_key=True)  # Random hex token, also the access key
+    student_id = db.Column(db.String(8), db.ForeignKey('student.anonymous_id'), nullable=False)
+    assignment = db.Column(db.String(100), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done or error
+    http_status = db.Column(db.Integer)  # Status code the synchronous endpoint would have returned
+    result = db.Column(db.Text)  # JSON body the synchronous endpoint would have returned
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    finished_at = db.Column(db.DateTime)
+
+def latest_submissions_query():
+    """Query over only the latest submission of each student for each assignment"""
+    return db.session.query(Submission)\
+        .join(LatestSubmission, LatestSubmission.submission_id == Submission.id)
+
+def rank_latest_submissions_window():
+    """Rank every student's latest submission for every assignment in one SQL statement.
+
+    ROW_NUMBER() picks the latest submission per student per assignment and
+    PERCENT_RANK() ranks those within each assignment, so ties behave exactly
+    like ranking.rank_map.
+    """
+    latest = db.session.query(
+        Submission.id,
+        func.row_number().over(
+            partition_by=(Submission.student_id, Submission.assignment),
+            order_by=(Submission.submission_time.desc(), Submission.id.desc())
+        ).label('row_number')
+    ).subquery()
+
+    rows = db.session.query(
+        Submission,
+        func.percent_rank().over(partition_by=Submission.assignment, order_by=Submission.runtime),
+        func.percent_rank().over(partition_by=Submission.assignment, order_by=Submission.submission_time),
+        func.percent_rank().over(partition_by=Submission.assignment, order_by=Submission.lint_errors),
+        func.count().over(partition_by=Submission.assignment)
+    ).join(latest, latest.c.id == Submission.id)\
+        .filter(latest.c.row_number == 1)\
+        .all()
+
+    return [
+        ranked_submission(
+            submission,
+            rank_from_percent_rank(runtime_percent_rank, count),
+            rank_from_percent_rank(time_percent_rank, count),
+            rank_from_percent_rank(lint_percent_rank, count),
+            count,
+            submission.assignment
+        )
+        for submission, runtime_percent_rank, time_percent_rank, lint_percent_rank, count in rows
+    ]
+
+def rank_all_latest_submissions():
+    """Rank the latest submissions of every assignment with a single query.
+
+    Returns:
+        list: Ranked entries as produced by ranking.rank_submissions
+    """
+    if app.config['LEADERBOARD_QUERY_MODE'] == 'window':
+        return rank_latest_submissions_window()
+
+    submissions_by_assignment = defaultdict(list)
+    for submission in latest_submissions_query().all():
+        submissions_by_assignment[submission.assignment].append(submission)
+
+    ranked = []
+    for assignment, submissions in submissions_by_assignment.items():
+        ranked.extend(rank_submissions(submissions, assignment))
+    return ranked
 
 def convert_to_est(utc_dt):
     est = pytz.timezone('US/Eastern')
@@ -133,6 +421,34 @@ def is_success_status(status):
     s = (status or '').strip().lower()
     return ('success' in s) or ('pass' in s) or (s == 'ok')
 
+def configure_sqlite_connection(dbapi_connection, connection_record):
+    """Apply the SQLite PRAGMA profile to every new connection in the pool"""
+    apply_sqlite_pragmas(dbapi_connection, app.config['SQLITE_PRAGMAS'])
+
+# Create the database tables
+with app.app_context():
+    # Registered before the first connection so every connection, including the CLI scripts', is tuned
+    event.listen(db.engine, 'connect', configure_sqlite_connection)
+
+    db.create_all()
+
+    # Existing databases predate the LatestSubmission table; backfill it once
+    if LatestSubmission.query.first() is None and Submission.query.first() is not None:
+        rebuild_latest_submissions()
+
+    # Likewise for the per-day submission counts behind the submissions chart
+    if DailySubmissionStats.query.first() is None and Submission.query.first() is not None:
+        rebuild_daily_submission_stats()
+
+    # Jobs queued or running when the server last stopped will never finish; close them out
+    GradingJob.query.filter(GradingJob.status.in_(['queued', 'running'])).update({
+        GradingJob.status: 'error',
+        GradingJob.http_status: 503,
+        GradingJob.result: json.dumps({"error": "The server restarted before this submission was graded, please submit again"}),
+        GradingJob.finished_at: datetime.now(timezone.utc).replace(tzinfo=None)
+    }, synchronize_session=False)
+    db.session.commit()
+
 def populate_student_table():
     """
     Populate the student table with all students in the class
@@ -187,6 +503,9 @@ def get_student(student_token):
 
     return student
 
+# File extensions run_lint knows how to lint
+LINT_EXTENSIONS = ('.py', '.c', '.cc', '.cpp')
+
 def run_lint(file_path):
     file_ext = Path(file_path).suffix
     file_name = Path(file_path).name
@@ -244,149 +563,272 @@ def normalize_python_indentation(text, tab_size=4, align_to=4):
         norm_lines.append((" " * spaces) + rest)
     return "\n".join(norm_lines) + ("\n" if text.endswith("\n") else "")
 
-def calculate_ranks_for_assignment(assignment_name, allow_debug=False):
-    def rank_score(value, sorted_values):
-        """Assign a score between 0 and 1 based on rank"""
-        if len(sorted_values) == 1:
-            return 1.0, 0.0
-
-        rank = sorted_values.index(value)
-        return 1 - (rank / (len(sorted_values) - 1)), rank
+@single_flight
+def build_rank_index(allow_debug=False):
+    """Rank the latest submissions of every assignment among students with the given debug flag.
 
-    latest_submission_times = db.session.query(
-        Submission.student_id,
-        func.max(Submission.submission_time).label("latest_time")
-    ).filter(
-        Submission.assignment == assignment_name
-    ).group_by(
-        Submission.student_id
-    ).subquery()
-
-    latest_submissions = db.session.query(Submission)\
-        .join(latest_submission_times, 
-            (Submission.student_id == latest_submission_times.c.student_id) & 
-            (Submission.submission_time == latest_submission_times.c.latest_time))\
+    Returns:
+        dict: assignment -> {student_id: rank entry}
+    """
+    latest_submissions = latest_submissions_query()\
         .join(Student, Submission.student_id == Student.anonymous_id)\
         .filter(Student.debug == allow_debug)\
+        .all()
 
-    if not latest_submissions:
-        return []
+    submissions_by_assignment = defaultdict(list)
+    for submission in latest_submissions:
+        submissions_by_assignment[submission.assignment].append(submission)
+
+    index = {}
+    for assignment, submissions in submissions_by_assignment.items():
+        index[assignment] = {}
+        for ranked in rank_submissions(submissions, assignment):
+            submission = ranked['submission']
+            index[assignment][submission.student_id] = {
+                'student_id': submission.student_id,
+                'submission_id': submission.id,
+                'total_score': ranked['weighted_score'],
+                'runtime_rank': ranked['runtime_rank'] + 1,
+                'time_rank': ranked['time_rank'] + 1,
+                'lint_rank': ranked['lint_rank'] + 1,
+                'code_score': ranked['code_score'],
+                'submission_time': submission.submission_time
+            }
 
-    sorted_runtimes = sorted(s.runtime for s in latest_submissions)
-    sorted_submission_times = sorted(s.submission_time.timestamp() for s in latest_submissions)
-    sorted_lint_errors = sorted(s.lint_errors for s in latest_submissions)
+    return index
 
-    leaderboard_data = []
-    for submission in latest_submissions:
-        student_id = submission.student.anonymous_id
-        runtime_score, runtime_rank = rank_score(submission.runtime, sorted_runtimes)
-        time_score, time_rank = rank_score(submission.submission_time.timestamp(), sorted_submission_times)
-        lint_score, lint_rank = rank_score(submission.lint_errors, sorted_lint_errors)
-        code_score = submission.code_score / 100
-        
-        weighted_score = (
-            0.4 * runtime_score +
-            0.3 * lint_score +
-            0.2 * time_score +
-            0.1 * code_score
-        )
+def rank_index(allow_debug=False):
+    """Return the cached rank index, rebuilding it after any write"""
+    return rank_index_cache.get(('rank_index', allow_debug), lambda: build_rank_index(allow_debug))
 
-        if 'exercise' in assignment_name:
-            weighted_score *= 0.25
-        
-        leaderboard_data.append({
-            'student_id': student_id,
-            'total_score': weighted_score,
-            'runtime_rank': runtime_rank + 1,
-            'time_rank': time_rank + 1,
-            'lint_rank': lint_rank + 1,
-            'code_score': code_score,
-            'submission_time': submission.submission_time
-        })
+def calculate_ranks_for_assignment(assignment_name, allow_debug=False):
+    """Return the rank entry of every student's latest submission for one assignment"""
+    return list(rank_index(allow_debug).get(assignment_name, {}).values())
 
-    return leaderboard_data
+def student_assignment_ranks(student_id, allow_debug=False):
+    """Return one student's rank entries for all of their assignments.
+
+    Returns:
+        dict: assignment -> rank entry of the student's latest submission
+    """
+    return {
+        assignment: ranks[student_id]
+        for assignment, ranks in rank_index(allow_debug).items()
+        if student_id in ranks
+    }
 
 @app.route('/assignment/<name>')
 def assignment_view(name):
-    """View all submissions for an assignment"""
-    # Get all submissions for the assignment, ordered by submission time descending
-    all_submissions = Submission.query\
-        .join(Student, Submission.student_id == Student.anonymous_id)\
-        .filter(Submission.assignment == name)\
-        .order_by(Submission.submission_time.desc())\
-        .all()
+    """View the ranked submissions for an assignment, one page of students at a time"""
+    per_page = request.args.get('per_page', app.config['ASSIGNMENT_PAGE_SIZE'], type=int)
+    per_page = max(1, min(per_page, app.config['ASSIGNMENT_MAX_PAGE_SIZE']))
+    page = request.args.get('page', 1, type=int)
 
-    # Calculate overall stats
-    submission_count = len(all_submissions)
-    avg_code_score = sum(s.code_score for s in all_submissions) / submission_count if submission_count else 0.0
-    avg_runtime = sum(s.runtime for s in all_submissions) / submission_count if submission_count else 0.0
-    avg_lint_errors = sum(s.lint_errors for s in all_submissions) / submission_count if submission_count else 0.0
-    if any(s.lines_of_code for s in all_submissions):
-        avg_lines_of_code = sum(s.lines_of_code for s in all_submissions) / submission_count
+    assignment_submissions = Submission.query\
+        .join(Student, Submission.student_id == Student.anonymous_id)\
+        .filter(Submission.assignment == name)
+
+    # Calculate overall stats in the database rather than over every loaded row
+    stats_row = assignment_submissions.with_entities(
+        func.count(Submission.id),
+        func.avg(Submission.code_score),
+        func.avg(Submission.runtime),
+        func.avg(Submission.lint_errors),
+        func.sum(Submission.lines_of_code),
+        # Matches any(s.lines_of_code ...): -1 counts as a value, 0 and NULL do not
+        func.count(case((Submission.lines_of_code != 0, 1))),
+        func.min(Submission.lines_of_code),
+        func.min(Submission.runtime),
+        func.max(Submission.code_score)
+    ).one()
+    (submission_count, avg_code_score, avg_runtime, avg_lint_errors,
+     total_lines_of_code, nonzero_lines_of_code, fewest_lines_of_code,
+     fastest_runtime, highest_code_score) = stats_row
+
+    if nonzero_lines_of_code:
+        avg_lines_of_code = total_lines_of_code / submission_count
     else:
         avg_lines_of_code = -1
-    fastest_runtime = min(s.runtime for s in all_submissions) if submission_count else 0.0
-    highest_code_score = max(s.code_score for s in all_submissions) if submission_count else 0.0
-    if any(s.lines_of_code for s in all_submissions):
-        fewest_lines_of_code = min(s.lines_of_code for s in all_submissions)
-    else:
         fewest_lines_of_code = -1
 
-    # Prepare submissions with display names, leaderboard points, and ranks
-    for sub in all_submissions:
-        display_name = sub.student.net_id if sub.student.display_net_id else sub.student.anonymous_id
-        sub.display_name = display_name
+    # Page over the ranked latest submissions, excluding debug students, in leaderboard order
+    ranked = sorted(calculate_ranks_for_assignment(name, allow_debug=False),
+                    key=lambda entry: (-entry['total_score'], entry['time_rank'], entry['student_id']))
+    page_count = max(1, -(-len(ranked) // per_page))
+    page = max(1, min(page, page_count))
+    page_ranks = ranked[(page - 1) * per_page:page * per_page]
+    ranks_by_submission = {entry['submission_id']: entry for entry in page_ranks}
+
+    # Load the page's latest submissions together with those students' older ones
+    rows = assignment_submissions\
+        .options(contains_eager(Submission.student))\
+        .filter(Submission.student_id.in_([entry['student_id'] for entry in page_ranks]))\
+        .order_by(Submission.submission_time.desc(), Submission.id.desc())\
+        .all()
+    latest_by_id = {}
+    older_by_student = defaultdict(list)
+    for sub in rows:
+        sub.display_name = sub.student.net_id if sub.student.display_net_id else sub.student.anonymous_id
+        if sub.id in ranks_by_submission:
+            latest_by_id[sub.id] = sub
+        else:
+            older_by_student[sub.student_id].append(sub)
 
-    # Use the calculate_ranks_for_assignment function to get ranked submissions, excluding debug students
-    lbd = calculate_ranks_for_assignment(name, allow_debug=False)
+    # Each ranked row is followed by the student's older submissions, hidden until expanded
+    page_submissions = []
+    for entry in page_ranks:
+        sub = latest_by_id.get(entry['submission_id'])
+        if sub is None:
+            continue
+        sub.is_most_recent = True
 
-    for sub in all_submissions:
+        sub.submission_time = convert_to_est(sub.submission_time)
+        sub.leaderboard_points = entry['total_score']
+        sub.runtime_rank = entry['runtime_rank']
+        sub.lint_rank = entry['lint_rank']
+        sub.time_rank = entry['time_rank']
 
-        for lbd_sub in lbd:
-            if sub.submission_time == lbd_sub['submission_time']:
-                sub.is_most_recent = True
+        page_submissions.append(sub)
+        page_submissions.extend(older_by_student.get(sub.student_id, []))
 
-                sub.submission_time = convert_to_est(sub.submission_time)
-                sub.leaderboard_points = lbd_sub['total_score']
-                sub.runtime_rank = lbd_sub['runtime_rank']
-                sub.lint_rank = lbd_sub['lint_rank']
-                sub.time_rank = lbd_sub['time_rank']
-                break
+    # Students with older submissions on this page get an expand toggle on their ranked row
+    repeat_students = set(older_by_student)
 
-    # Pass all submissions and recent submissions with ranks to the template
     return render_template('assignment.html',
-                           submissions=all_submissions,
+                           submissions=page_submissions,
                            assignment_name=name,
+                           repeat_students=repeat_students,
+                           per_page=per_page,
+                           page=page,
+                           page_count=page_count,
                            stats={
                                'submission_count': submission_count,
-                               'avg_code_score': avg_code_score,
-                               'avg_runtime': avg_runtime,
-                               'avg_lint_errors': avg_lint_errors,
+                               'avg_code_score': avg_code_score or 0.0,
+                               'avg_runtime': avg_runtime or 0.0,
+                               'avg_lint_errors': avg_lint_errors or 0.0,
                                'avg_lines_of_code': avg_lines_of_code,
-                               'fastest_runtime': fastest_runtime,
-                               'highest_code_score': highest_code_score,
+                               'fastest_runtime': fastest_runtime or 0.0,
+                               'highest_code_score': highest_code_score or 0.0,
                                'fewest_lines_of_code': fewest_lines_of_code,
                            })
 
+# Columns the submission browser and export may be sorted by
+SUBMISSION_SORT_COLUMNS = ['id', 'submission_time', 'student_id', 'assignment', 'status',
+                           'code_score', 'runtime', 'lint_errors', 'lines_of_code']
+
+# Columns written by the submission export, in order
+SUBMISSION_EXPORT_COLUMNS = ['id', 'submission_time', 'student_id', 'assignment', 'status',
+                             'code_score', 'runtime', 'lint_errors', 'lines_of_code']
+
+def sorted_submissions_query(sort_by, order):
+    """
+    Build the submission query ordered by `sort_by`, with the id as a tiebreaker.
+
+    Returns:
+        tuple: (query, sort column, whether the order is descending)
+    """
+    if sort_by not in SUBMISSION_SORT_COLUMNS:
+        sort_by = 'submission_time'
+    sort_column = getattr(Submission, sort_by)
+    descending = order == 'desc'
+
+    if descending:
+        query = Submission.query.order_by(sort_column.desc(), Submission.id.desc())
+    else:
+        query = Submission.query.order_by(sort_column.asc(), Submission.id.asc())
+    return query, sort_column, descending
+
+def keyset_after(sort_column, cursor, descending):
+    """
+    Filter for the rows that come after `cursor` in (sort column, id) order.
+
+    SQLite sorts NULLs before every other value, so they come first in
+    ascending order and last in descending order.
+    """
+    value = getattr(cursor, sort_column.key)
+    if descending:
+        if value is None:
+            return and_(sort_column.is_(None), Submission.id < cursor.id)
+        return or_(sort_column < value,
+                   sort_column.is_(None),
+                   and_(sort_column == value, Submission.id < cursor.id))
+
+    if value is None:
+        return or_(sort_column.isnot(None),
+                   and_(sort_column.is_(None), Submission.id > cursor.id))
+    return or_(sort_column > value,
+               and_(sort_column == value, Submission.id > cursor.id))
+
 @app.route('/assignments')
 def index():
-    """View all submissions with sorting options"""
+    """Browse all submissions with sorting options, one page at a time"""
     sort_by = request.args.get('sort', 'submission_time')
     order = request.args.get('order', 'desc')
-    
-    # Build the query
-    query = Submission.query
-    
-    # Apply sorting
-    if hasattr(Submission, sort_by):
-        sort_attr = getattr(Submission, sort_by)
-        if order == 'desc':
-            query = query.order_by(sort_attr.desc())
-        else:
-            query = query.order_by(sort_attr.asc())
-    
-    submissions = query.all()
-    return render_template('index.html', submissions=submissions)
+    per_page = request.args.get('per_page', app.config['ASSIGNMENT_PAGE_SIZE'], type=int)
+    per_page = max(1, min(per_page, app.config['ASSIGNMENT_MAX_PAGE_SIZE']))
+    after_id = request.args.get('after', type=int)
+
+    query, sort_column, descending = sorted_submissions_query(sort_by, order)
+
+    # Keyset pagination: continue strictly after the last submission of the previous page
+    if after_id is not None:
+        cursor = db.session.get(Submission, after_id)
+        if cursor is not None:
+            query = query.filter(keyset_after(sort_column, cursor, descending))
+
+    submissions = query.limit(per_page + 1).all()
+    has_more = len(submissions) > per_page
+    submissions = submissions[:per_page]
+
+    return render_template('index.html',
+                           submissions=submissions,
+                           sort=sort_column.key,
+                           order='desc' if descending else 'asc',
+                           per_page=per_page,
+                           is_first_page=after_id is None,
+                           next_after=submissions[-1].id if has_more else None)
+
+def export_row(submission):
+    """Return the exported fields of a submission"""
+    row = {column: getattr(submission, column) for column in SUBMISSION_EXPORT_COLUMNS}
+    if row['submission_time'] is not None:
+        row['submission_time'] = row['submission_time'].isoformat()
+    return row
+
+@app.route('/assignments/export')
+def export_submissions():
+    """Stream every submission as CSV or JSON without loading the table into memory"""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'json'):
+        return jsonify({"error": "Format must be 'csv' or 'json'"}), 400
+
+    query, _, _ = sorted_submissions_query(request.args.get('sort', 'submission_time'),
+                                           request.args.get('order', 'desc'))
+    submissions = query.yield_per(500)
+
+    def stream_csv():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=SUBMISSION_EXPORT_COLUMNS)
+        writer.writeheader()
+        for submission in submissions:
+            writer.writerow(export_row(submission))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+        yield buffer.getvalue()
+
+    def stream_json():
+        yield '['
+        separator = ''
+        for submission in submissions:
+            yield separator + json.dumps(export_row(submission))
+            separator = ','
+        yield ']'
+
+    if export_format == 'csv':
+        return Response(stream_with_context(stream_csv()), mimetype='text/csv',
+                        headers={'Content-Disposition': 'attachment; filename=submissions.csv'})
+    return Response(stream_with_context(stream_json()), mimetype='application/json')
 
 @app.route('/student/<name>', methods=['GET', 'POST'])
 def student_view(name):
@@ -401,6 +843,7 @@ def student_view(name):
         if form.secret_token.data == student.secret_token:
             student.display_net_id = form.display_net_id.data
             db.session.commit()
+            publish_data_change()
             flash("Preferences updated successfully!", "success")
             return redirect(url_for('student_view', name=name))
         else:
@@ -408,43 +851,22 @@ def student_view(name):
 
     form.display_net_id.data = student.display_net_id
 
-    # Fetch the most recent submission for each student for each assignment
-    latest_submission_times = db.session.query(
-        Submission.student_id,
-        Submission.assignment,
-        func.max(Submission.submission_time).label("latest_time")
-    ).group_by(
-        Submission.student_id, Submission.assignment
-    ).subquery()
-
-    recent_submissions = db.session.query(Submission)\
-        .join(latest_submission_times, 
-              (Submission.student_id == latest_submission_times.c.student_id) & 
-              (Submission.assignment == latest_submission_times.c.assignment) & 
-              (Submission.submission_time == latest_submission_times.c.latest_time))\
-        .all()
+    # Look up the student's ranks for every assignment they submitted to in one call
+    assignment_ranks = student_assignment_ranks(name, allow_debug=student.debug)
 
     # Fetch all submissions for the student
     submissions = Submission.query.filter_by(student_id=name)\
                                 .order_by(Submission.submission_time.desc())\
                                 .all()
 
-    # Filter recent submissions for the same assignment
-    recent_assignment_submissions = [s for s in submissions if s in recent_submissions]
-
     for sub in submissions:
-        if sub in recent_assignment_submissions:
+        ranks = assignment_ranks.get(sub.assignment)
+        if ranks and ranks['submission_id'] == sub.id:
             sub.is_most_recent = True
-
-            lbd = calculate_ranks_for_assignment(sub.assignment, allow_debug=student.debug)
-
-            for lbd_sub in lbd:
-                if lbd_sub['student_id'] == sub.student_id:
-                    sub.runtime_rank = lbd_sub['runtime_rank']
-                    sub.lint_rank = lbd_sub['lint_rank']
-                    sub.time_rank = lbd_sub['time_rank']
-                    sub.leaderboard_points = lbd_sub['total_score']
-                    break
+            sub.runtime_rank = ranks['runtime_rank']
+            sub.lint_rank = ranks['lint_rank']
+            sub.time_rank = ranks['time_rank']
+            sub.leaderboard_points = ranks['total_score']
 
     # Calculate averages
     if submissions:
@@ -471,7 +893,7 @@ def load_due_dates():
 
 @app.route('/')
 def leaderboard():
-    leaderboard_data = calculate_leaderboard_data()
+    leaderboard_data = cached_leaderboard_data()
     
     # Query the database for assignments and their due dates
     assignments = db.session.query(Assignment.name, Assignment.deadline).all()
@@ -502,8 +924,84 @@ def leaderboard():
 
 @app.route('/leaderboard_data')
 def leaderboard_data():
-    leaderboard_data = calculate_leaderboard_data()
-    return jsonify(leaderboard_data)
+    """Return the leaderboard.
+
+    Without a `since` parameter this is the full list of rows. With
+    `since=<version>` the response is an object carrying the new version and
+    only the rows that changed since that version, falling back to every row
+    (`full: true`) when the version is empty or no longer known.
+    """
+    version, leaderboard_data = cached_leaderboard_snapshot()
+    if 'since' not in request.args:
+        return conditional_json(version, lambda: leaderboard_data)
+
+    since = request.args.get('since')
+
+    def leaderboard_delta():
+        delta = leaderboard_history.delta(since, version)
+        if delta is None:
+            return {'version': version, 'full': True, 'rows': leaderboard_data}
+
+        changed, removed = delta
+        return {
+            'version': version,
+            'full': False,
+            'rows': changed,
+            'removed': removed,
+            'order': [entry['student_id'] for entry in leaderboard_data]
+        }
+
+    # `since` is client input, so hash it rather than embedding it in the ETag
+    since_tag = hashlib.sha256(since.encode()).hexdigest()[:16]
+    return conditional_json(f"{version}-since-{since_tag}", leaderboard_delta)
+
+def is_admin_request():
+    """Whether the request comes from a logged-in admin session or carries the admin token in X-Admin-Token"""
+    if 'admin_token' in session:
+        return True
+
+    header_token = request.headers.get('X-Admin-Token')
+    if not header_token:
+        return False
+    admin_token = AdminToken.query.first()
+    return admin_token is not None and secrets.compare_digest(header_token, admin_token.token)
+
+@app.route('/admin/dredd_health')
+def dredd_health():
+    """Report the circuit state, error rate and latency of each Dredd backend"""
+    if not is_admin_request():
+        return jsonify({"error": "Admin access required"}), 403
+    return jsonify({'backends': dredd_client.health_report()})
+
+@app.route('/admin/grading_cache', methods=['GET', 'POST'])
+def grading_cache_admin():
+    """Report the grading cache's size and hit rate; POST clears it after an assignment's tests change.
+
+    POST takes an optional `assignment` (form field or JSON); without it the whole cache is cleared.
+    """
+    if not is_admin_request():
+        return jsonify({"error": "Admin access required"}), 403
+
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or request.form
+        invalidate_grading_cache(data.get('assignment') or None)
+
+    return jsonify(grading_cache.stats())
+
+@app.route('/admin/admission')
+def admission_metrics():
+    """Report grading queue depth, wait times and rejected submissions"""
+    if not is_admin_request():
+        return jsonify({"error": "Admin access required"}), 403
+
+    data = admission.stats()
+    data['grading_jobs'] = dict(
+        db.session.query(GradingJob.status, func.count(GradingJob.id))
+        .filter(GradingJob.status.in_(['queued', 'running']))
+        .group_by(GradingJob.status)
+        .all()
+    )
+    return jsonify(data)
 
 @app.route('/admin', methods=['GET', 'POST'])
 def view_mappings():
@@ -557,6 +1055,11 @@ def view_mappings():
                     Assignment.query.filter(Assignment.name.like('%exercise%')).update({Assignment.is_open: False})
                     db.session.commit()
                     flash("All exercises closed successfully!", "success")
+                elif action == 'clear_grading_cache':
+                    # The assignment's tests changed, so earlier Dredd results no longer apply
+                    assignment_name = request.form.get('assignment_name') or None
+                    invalidate_grading_cache(assignment_name)
+                    flash(f"Cached grading results cleared for {assignment_name or 'all assignments'}!", "success")
             elif 'exercise_id' in request.form:
                 exercise_id = request.form.get('exercise_id')
                 is_open = 'is_open' in request.form
@@ -589,6 +1092,9 @@ def view_mappings():
                 db.session.commit()
                 flash("Student added successfully!", "success")
 
+            # Any admin change can affect rankings, visibility or display names
+            publish_data_change()
+
         # Get completed assignments count for each student
         completed_assignments_count = db.session.query(
             Submission.student_id,
@@ -617,20 +1123,50 @@ def view_mappings():
     
     return render_template('admin_access.html', form=form)
 
+@single_flight
+def navigation_data():
+    """Load the student ids and assignment names used by the search box"""
+    students = [
+        {'anonymous_id': anonymous_id}
+        for (anonymous_id,) in db.session.query(Student.anonymous_id).order_by(Student.id)
+    ]
+    assignments = [a[0] for a in db.session.query(Submission.assignment).distinct()]
+    return dict(students=students, assignments=assignments)
+
 @app.context_processor
 def inject_data():
-    students = Student.query.all()
-    assignments = db.session.query(Submission.assignment).distinct().all()
-    return dict(students=students, assignments=[a[0] for a in assignments])
+    # New students and assignment names appear through writes that bump the data version, or after the TTL
+    return navigation_cache.get('navigation', navigation_data)
 
-def calculate_leaderboard_data():
-    def rank_score(value, sorted_values):
-        """Assign a score between 0 and 1 based on rank"""
-        if len(sorted_values) == 1:
-            return 1.0
-        rank = sorted_values.index(value)
-        return 1 - (rank / (len(sorted_values) - 1))
+def conditional_json(etag, compute):
+    """Respond 304 if the client already has `etag`, otherwise jsonify compute() with that ETag.
+
+    compute is only called when the client's copy is stale.
+    """
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = jsonify(compute())
+    response.set_etag(etag)
+    # Let clients cache the body but revalidate it on every poll
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def compute_leaderboard_snapshot():
+    """Calculate the leaderboard and record it as a new version"""
+    leaderboard_data = calculate_leaderboard_data()
+    return leaderboard_history.record(leaderboard_data), leaderboard_data
+
+def cached_leaderboard_snapshot():
+    """Return (version, leaderboard), recomputing only after a write or once the TTL expires"""
+    return leaderboard_cache.get('leaderboard', compute_leaderboard_snapshot)
+
+def cached_leaderboard_data():
+    """Return the leaderboard, recomputing only after a write or once the TTL expires"""
+    return cached_leaderboard_snapshot()[1]
 
+@single_flight
+def calculate_leaderboard_data():
     # Query the database for assignments that are due
     today = datetime.now(pytz.timezone('US/Eastern')).date()
     due_assignments = Assignment.query.filter(
@@ -641,77 +1177,43 @@ def calculate_leaderboard_data():
     student_scores = {}
     debug_scores = {}
 
-    # Get all distinct assignments
-    all_assignments = db.session.query(Submission.assignment).distinct().all()
-    all_assignments = [a[0] for a in all_assignments]
-
-    for assignment in all_assignments:
-        latest_submission_times = db.session.query(
-            Submission.student_id,
-            func.max(Submission.submission_time).label("latest_time")
-        ).filter(
-            Submission.assignment == assignment
-        ).group_by(
-            Submission.student_id
-        ).subquery()
-
-        latest_submissions = db.session.query(Submission)\
-            .join(latest_submission_times, 
-                (Submission.student_id == latest_submission_times.c.student_id) & 
-                (Submission.submission_time == latest_submission_times.c.latest_time))\
-            .all()
-
-        if not latest_submissions:
-            continue
-
-        sorted_runtimes = sorted(s.runtime for s in latest_submissions)
-        sorted_submission_times = sorted(s.submission_time.timestamp() for s in latest_submissions)
-        sorted_lint_errors = sorted(s.lint_errors for s in latest_submissions)
+    # Load every student once up front instead of lazily per submission and per row
+    students = {student.anonymous_id: student for student in Student.query.all()}
 
-        for submission in latest_submissions:
-            student_id = submission.student.anonymous_id
-            scores_dict = debug_scores if submission.student.debug else student_scores
+    # Rank the latest submissions of all assignments at once
+    for ranked in rank_all_latest_submissions():
+        submission = ranked['submission']
+        student = students[submission.student_id]
+        student_id = student.anonymous_id
+        scores_dict = debug_scores if student.debug else student_scores
 
-            if student_id not in scores_dict:
-                scores_dict[student_id] = {
-                    'total_score': 0, 
-                    'exercises_completed': 0,
-                    'challenges_completed': 0,
-                    'assignment_count': 0,
-                    'total_runtime': 0,
-                    'total_submission_time': 0,
-                    'total_lint_errors': 0,
-                    'total_lines_of_code': 0,
-                    'tags': [],
-                    'is_debug': submission.student.debug
-                }
+        if student_id not in scores_dict:
+            scores_dict[student_id] = {
+                'total_score': 0, 
+                'exercises_completed': 0,
+                'challenges_completed': 0,
+                'assignment_count': 0,
+                'total_runtime': 0,
+                'total_submission_time': 0,
+                'total_lint_errors': 0,
+                'total_lines_of_code': 0,
+                'tags': [],
+                'is_debug': student.debug
+            }
 
-            runtime_rank = rank_score(submission.runtime, sorted_runtimes)
-            time_rank = rank_score(submission.submission_time.timestamp(), sorted_submission_times)
-            lint_rank = rank_score(submission.lint_errors, sorted_lint_errors)
-            code_score = submission.code_score / 100
-            
-            weighted_score = (
-                0.4 * runtime_rank +
-                0.3 * lint_rank +
-                0.2 * time_rank +
-                0.1 * code_score
-            )
-
-            if 'exercise' in assignment:
-                weighted_score *= 0.25
-                scores_dict[student_id]['exercises_completed'] += 1
-            else:
-                scores_dict[student_id]['challenges_completed'] += 1
-            
-            scores_dict[student_id]['total_score'] += weighted_score
-            scores_dict[student_id]['total_runtime'] += submission.runtime
-            scores_dict[student_id]['total_submission_time'] += time_rank
-            scores_dict[student_id]['total_lint_errors'] += submission.lint_errors
-            if submission.lines_of_code:
-                scores_dict[student_id]['total_lines_of_code'] += submission.lines_of_code
-            else:
-                scores_dict[student_id]['total_lines_of_code'] += -1
+        if 'exercise' in submission.assignment:
+            scores_dict[student_id]['exercises_completed'] += 1
+        else:
+            scores_dict[student_id]['challenges_completed'] += 1
+        
+        scores_dict[student_id]['total_score'] += ranked['weighted_score']
+        scores_dict[student_id]['total_runtime'] += submission.runtime
+        scores_dict[student_id]['total_submission_time'] += ranked['time_score']
+        scores_dict[student_id]['total_lint_errors'] += submission.lint_errors
+        if submission.lines_of_code:
+            scores_dict[student_id]['total_lines_of_code'] += submission.lines_of_code
+        else:
+            scores_dict[student_id]['total_lines_of_code'] += -1
 
     # Mark students who haven't completed at least 50% of the due assignments as debug
     min_assignments_required = due_assignments * 0.5
@@ -721,16 +1223,22 @@ def calculate_leaderboard_data():
 
     # Add historic students (with semester tags) to the leaderboard as debug students
     # Historic students are those with semester values AND debug=True (marked as historic)
-    historic_students = Student.query.filter(
-        Student.semester.isnot(None),
-        Student.debug == True
-    ).all()
+    historic_students = [
+        student for student in students.values()
+        if student.semester is not None and student.debug
+    ]
+
+    # Fetch all historic performance records in one query, keeping the first per student
+    historic_performances = {}
+    for performance in HistoricStudentPerformance.query.filter(
+        HistoricStudentPerformance.student_anonymous_id.in_([s.anonymous_id for s in historic_students])
+    ).order_by(HistoricStudentPerformance.id):
+        historic_performances.setdefault(performance.student_anonymous_id, performance)
+
     for student in historic_students:
-        if student.anonymous_id not in {**student_scores, **debug_scores}:
+        if student.anonymous_id not in student_scores and student.anonymous_id not in debug_scores:
             # Get historic performance data if available
-            historic_performance = HistoricStudentPerformance.query.filter_by(
-                student_anonymous_id=student.anonymous_id
-            ).first()
+            historic_performance = historic_performances.get(student.anonymous_id)
             
             if historic_performance:
                 # Use actual historic performance data
@@ -768,13 +1276,14 @@ def calculate_leaderboard_data():
     
     # Add all current students who haven't made any submissions yet
     # Current students are those with a semester value but not historic (debug=False)
-    current_students = Student.query.filter(
-        Student.semester.isnot(None),  # Has a semester value
-        Student.debug == False  # Not debug/historic students
-    ).all()
+    current_students = [
+        student for student in students.values()
+        if student.semester is not None  # Has a semester value
+        and not student.debug  # Not debug/historic students
+    ]
     
     for student in current_students:
-        if student.anonymous_id not in {**student_scores, **debug_scores}:
+        if student.anonymous_id not in student_scores and student.anonymous_id not in debug_scores:
             # Add students with no submissions yet (mark as debug/unranked)
             student_scores[student.anonymous_id] = {
                 'total_score': 0,
@@ -791,7 +1300,7 @@ def calculate_leaderboard_data():
 
     leaderboard_data = []
     for student_id, scores in {**student_scores, **debug_scores}.items():
-        student = Student.query.filter_by(anonymous_id=student_id).first()
+        student = students[student_id]
         display_name = student.net_id if student.display_net_id else student.anonymous_id
 
         # Handle division by zero for students with no submissions
@@ -869,36 +1378,93 @@ def calculate_leaderboard_data():
 
     return leaderboard_data
 
+def ticker_entry(sub):
+    """Convert a submission into the dictionary shown in the recent submissions ticker"""
+    return {
+        'submission_time': convert_to_est(sub.submission_time).strftime('%m-%d %-I:%M:%S %p'),
+        'student_name': sub.student.net_id if sub.student.display_net_id else sub.student.anonymous_id,
+        'student_id': sub.student.anonymous_id,  # Always include for the link
+        'assignment': sub.assignment,
+        'code_score': sub.code_score,
+        'runtime': sub.runtime,
+        'lint_errors': sub.lint_errors,
+        'lines_of_code': sub.lines_of_code,
+        'status': sub.status
+    }
+
+def publish_data_change(submission_entry=None):
+    """Bump the data version and push it to /events subscribers.
+
+    When a new submission caused the change, its ticker entry is pushed too.
+    """
+    version = bump_data_version()
+    if submission_entry is None:
+        event_broker.publish('leaderboard', {'version': version})
+    else:
+        event_broker.publish('submission', {'version': version, 'submission': submission_entry})
+    return version
+
+@single_flight
+def recent_submissions_data():
+    """Return the most recent submissions as plain dictionaries for the ticker"""
+    # Fetch the most recent submissions, limit to the last 5 for example
+    recent_subs = Submission.query\
+        .options(joinedload(Submission.student))\
+        .order_by(Submission.submission_time.desc())\
+        .limit(5)\
+        .all()
+
+    return [ticker_entry(sub) for sub in recent_subs]
+
 @app.route('/recent_submissions')
 def recent_submissions():
     try:
-        # Fetch the most recent submissions, limit to the last 5 for example
-        recent_subs = Submission.query.order_by(Submission.submission_time.desc()).limit(5).all()
-
-        # Convert submission times to EST
-        for submission in recent_subs:
-            submission.submission_time = convert_to_est(submission.submission_time)
-
-        # Convert submissions to a list of dictionaries
-        recent_subs_data = [{
-            'submission_time': sub.submission_time.strftime('%m-%d %-I:%M:%S %p'),
-            'student_name': sub.student.net_id if sub.student.display_net_id else sub.student.anonymous_id,
-            'student_id': sub.student.anonymous_id,  # Always include for the link
-            'assignment': sub.assignment,
-            'code_score': sub.code_score,
-            'runtime': sub.runtime,
-            'lint_errors': sub.lint_errors,
-            'lines_of_code': sub.lines_of_code,
-            'status': sub.status
-        } for sub in recent_subs]
-
-        return jsonify(recent_subs_data)
+        # Submissions recorded by other processes do not bump our data version, but do move the newest id
+        newest_id = db.session.query(func.max(Submission.id)).scalar()
+        return conditional_json(version_tag('recent', newest_id), recent_submissions_data)
     except Exception as e:
         app.logger.error(f"Error fetching recent submissions: {e}")
         return jsonify({"error": "An error occurred while fetching recent submissions."}), 500
 
 
 
+@single_flight
+def submissions_per_day_data(start_date, today):
+    """Count successful and failed submissions per EST day from start_date through today.
+
+    A start_date of None includes every submission.
+    """
+    # Read the per-day counts from the rollup table maintained on every submission
+    days = DailySubmissionStats.query
+    if start_date is not None:
+        days = days.filter(DailySubmissionStats.date >= start_date)
+
+    submissions_count = defaultdict(lambda: {'success': 0, 'failure': 0})
+    for day in days:
+        submissions_count[day.date] = {'success': day.success, 'failure': day.failure}
+
+    # Prepare data for the chart, ensuring all days in the range are included
+    chart_data = []
+    if submissions_count:
+        first_day = min(submissions_count.keys()) if start_date is None else start_date
+        current_date = first_day
+        while current_date <= today:
+            chart_data.append({
+                'date': current_date.strftime('%Y-%m-%d'),
+                'success': submissions_count[current_date]['success'],
+                'failure': submissions_count[current_date]['failure']
+            })
+            current_date += timedelta(days=1)
+    else:
+        # No submissions; still return a single day (today) with zeros for better UX
+        chart_data.append({
+            'date': today.strftime('%Y-%m-%d'),
+            'success': 0,
+            'failure': 0
+        })
+
+    return chart_data
+
 @app.route('/submissions_per_day')
 def submissions_per_day():
     try:
@@ -923,55 +1489,328 @@ def submissions_per_day():
         else:
             return jsonify({"error": "Invalid range parameter."}), 400
 
-        # Query submissions based on the start date; compare using midnight of the start day
-        if start_date is not None:
-            start_dt = datetime.combine(start_date, datetime.min.time())
-            submissions = Submission.query.filter(Submission.submission_time >= start_dt).all()
-        else:
-            submissions = Submission.query.all()
-
-        # Count successful and unsuccessful submissions per day
-        submissions_count = defaultdict(lambda: {'success': 0, 'failure': 0})
-        for sub in submissions:
-            date = convert_to_est(sub.submission_time).date()
-            if is_success_status(sub.status):
-                submissions_count[date]['success'] += 1
-            else:
-                submissions_count[date]['failure'] += 1
-
-        # Prepare data for the chart, ensuring all days in the range are included
-        chart_data = []
-        if submissions_count:
-            first_day = min(submissions_count.keys()) if start_date is None else start_date
-            current_date = first_day
-            while current_date <= today:
-                chart_data.append({
-                    'date': current_date.strftime('%Y-%m-%d'),
-                    'success': submissions_count[current_date]['success'],
-                    'failure': submissions_count[current_date]['failure']
-                })
-                current_date += timedelta(days=1)
-        else:
-            # No submissions; still return a single day (today) with zeros for better UX
-            chart_data.append({
-                'date': today.strftime('%Y-%m-%d'),
-                'success': 0,
-                'failure': 0
-            })
-
-        return jsonify(chart_data)
+        # The chart also changes at midnight, so the date is part of the tag, and with
+        # submissions recorded by other processes, which move the newest id
+        newest_id = db.session.query(func.max(Submission.id)).scalar()
+        return conditional_json(version_tag('per-day', range_param, today, newest_id),
+                                lambda: submissions_per_day_data(start_date, today))
     except Exception as e:
         app.logger.error(f"Error fetching submissions per day: {e}")
         return jsonify({"error": "An error occurred while fetching submissions per day."}), 500
 
+@app.route('/events')
+def events():
+    """Stream leaderboard and ticker updates to the browser as Server-Sent Events"""
+    keepalive = app.config['EVENTS_KEEPALIVE']
+
+    def stream():
+        subscriber = event_broker.subscribe()
+        try:
+            # Let the client know which version it is starting from
+            yield format_sse('hello', {'version': data_version()})
+            while True:
+                try:
+                    yield subscriber.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+        finally:
+            event_broker.unsubscribe(subscriber)
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/details')
 def details():
     """Render the details page."""
     return render_template('details.html')
 
+# Lint runs on its own threads so it overlaps with the Dredd request
+lint_executor = ThreadPoolExecutor(max_workers=app.config['LINT_WORKERS'], thread_name_prefix='lint')
+
+# Warm lint workers, started on the first submission
+if app.config['LINT_ENGINE'] == 'warm':
+    lint_engine = LintEngine(
+        workers=app.config['LINT_ENGINE_WORKERS'],
+        max_jobs=app.config['LINT_ENGINE_MAX_JOBS'],
+        timeout=app.config['LINT_ENGINE_TIMEOUT']
+    )
+else:
+    lint_engine = None
+
+def lint_source(file_path):
+    """Lint a file on the warm lint engine, falling back to run_lint's subprocesses.
+
+    A file that times out is not linted again; the LintTimeout propagates.
+    """
+    if lint_engine is not None:
+        try:
+            result = lint_engine.lint(file_path)
+            if result is not None:
+                return result
+        except LintTimeout:
+            raise
+        except Exception as e:
+            print(f"Warm lint failed, running lint in a subprocess: {e}")
+    return run_lint(file_path)
+
+# Shared, pooled client for the Dredd grading backends
+dredd_client = DreddClient(
+    app.config['DREDD_BACKENDS'],
+    connect_timeout=app.config['DREDD_CONNECT_TIMEOUT'],
+    read_timeout=app.config['DREDD_READ_TIMEOUT'],
+    pool_size=app.config['DREDD_POOL_SIZE'],
+    hedge_after=app.config['DREDD_HEDGE_AFTER'] or None,
+    failure_threshold=app.config['DREDD_FAILURE_THRESHOLD'],
+    reset_timeout=app.config['DREDD_RESET_TIMEOUT']
+)
+
+def spool_upload(source_file, should_normalize):
+    """Copy an uploaded source file into a spooled buffer and return it.
+
+    The buffer stays in memory up to UPLOAD_SPOOL_MAX_SIZE bytes and spills
+    to disk beyond that. It outlives the request, so async jobs can grade it
+    later. The caller is responsible for closing it.
+    """
+    upload = tempfile.SpooledTemporaryFile(max_size=app.config['UPLOAD_SPOOL_MAX_SIZE'])
+    try:
+        filename = Path(source_file.filename or "").name
+        ext = Path(filename).suffix.lower()
+
+        if should_normalize and ext == '.py':
+            # Read, normalize, and store as UTF-8 text
+            raw = source_file.read()
+            try:
+                text = raw.decode('utf-8')
+            except UnicodeDecodeError:
+                # Fallback to latin-1 to preserve bytes if needed
+                text = raw.decode('latin-1')
+            normalized = normalize_python_indentation(text, tab_size=4, align_to=4)
+            upload.write(normalized.encode('utf-8'))
+        else:
+            # Store the uploaded file as-is
+            source_file.save(upload)
+        upload.seek(0)
+    except Exception:
+        upload.close()
+        raise
+
+    return upload
+
+def lint_upload(source, suffix):
+    """Lint an upload's bytes from a short-lived file on LINT_TEMP_DIR (tmpfs where available)"""
+    # The linters only read real files, and run_lint counts errors by this file's name
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=app.config['LINT_TEMP_DIR'])
+    try:
+        temp_file.write(source)
+        temp_file.close()
+        return lint_source(temp_file.name)
+    finally:
+        temp_file.close()
+        os.unlink(temp_file.name)
+
+def grading_cache_key(source, suffix, assignment, dredd_slug):
+    """Key an upload's grading results on its assignment, Dredd endpoint, file type and content hash"""
+    return assignment, dredd_slug, suffix.lower(), hashlib.sha256(source).hexdigest()
+
+def invalidate_grading_cache(assignment=None):
+    """Forget cached grading results for one assignment, or for all of them"""
+    if assignment is None:
+        grading_cache.clear()
+        return
+    removed = grading_cache.discard_where(lambda key: key[0] == assignment)
+    print(f"Cleared {removed} cached grading results for {assignment}")
+
+def grade_submission(upload, filename, assignment, dredd_slug, anon_student):
+    """
+    Lint a spooled upload, grade it with Dredd and record the submission.
+
+    Args:
+        upload (file): Spooled upload from spool_upload
+        filename (str): Original name of the uploaded file, forwarded to Dredd
+        assignment (str): Assignment name
+        dredd_slug (str): Dredd endpoint slug ('code' or 'debug')
+        anon_student (str): Anonymous id of the submitting student
+
+    Returns:
+        tuple: (response body, HTTP status code) for the client
+    """
+    # Reject files we cannot lint before spending a Dredd request on them
+    suffix = Path(filename or "").suffix
+    if suffix not in LINT_EXTENSIONS:
+        return {"ERROR": "Filetype not recognized for linting - please contact the instructor"}, 400
+
+    # Dredd needs the whole file in memory to build its multipart request anyway
+    upload.seek(0)
+    source = upload.read()
+
+    # Byte-identical resubmissions reuse the earlier lint and Dredd results
+    cache_key = grading_cache_key(source, suffix, assignment, dredd_slug)
+    cached = grading_cache.get(cache_key)
+    if cached is not None:
+        print(f"Reusing cached grading results for {assignment}")
+        lint_errors, lines_of_code, dredd_result, dredd_status, metrics = cached
+    else:
+        # Lint and grade at the same time; lint works on its own copy of the upload
+        lint_future = lint_executor.submit(lint_upload, source, suffix)
+        try:
+            # Grade with the configured Dredd backends
+            dredd_result, dredd_status = dredd_client.submit(dredd_slug, assignment, filename, source)
+        except DreddUnavailable as e:
+            print(f"All Dredd backends failed: {e}")
+            return {"error": "All submission endpoints are unavailable"}, 503
+
+        try:
+            lint_errors, lint_command, lines_of_code = lint_future.result()
+        except LintTimeout as e:
+            print(f"Lint timed out for {assignment}: {e}")
+            return {"ERROR": "Linting took too long - please contact the instructor"}, 400
+
+        if int(lint_errors) < 0:
+            return {"ERROR": "Filetype not recognized for linting - please contact the instructor"}, 400
+
+        print(dredd_result)
+        # Parse metrics from Dredd's response
+        metrics = parse_dredd_response(dredd_result)
+
+        # Only answers Dredd actually graded are reused; errors may be transient
+        if dredd_status == 200:
+            grading_cache.put(cache_key, (lint_errors, lines_of_code, dredd_result, dredd_status, metrics))
+
+    # Normalize status to canonical Success/Failure for DB consistency
+    normalized_status = 'Success' if is_success_status(metrics['result']) else 'Failure'
+
+    # Record the submission
+    submission = Submission(
+        student_id=anon_student,
+        assignment=assignment,
+        status=normalized_status,
+        code_score=metrics['code_score'],
+        runtime=metrics['runtime'],
+        lint_errors=lint_errors,  # Use the lint score from the script
+        lines_of_code=lines_of_code
+    )
+
+    db.session.add(submission)
+    db.session.flush()
+    record_latest_submission(submission)
+    record_daily_submission(submission)
+    db.session.commit()
+    publish_data_change(ticker_entry(submission))
+
+    # Return Dredd's original response
+    return dredd_result, dredd_status
+
+# Per-token limits for every submission, and the bounded queue in front of synchronous grading
+admission = AdmissionController(
+    max_active=app.config['ADMISSION_MAX_ACTIVE'],
+    max_queue=app.config['ADMISSION_QUEUE_SIZE'],
+    max_wait=app.config['ADMISSION_MAX_WAIT'],
+    token_rate=app.config['ADMISSION_TOKEN_RATE'],
+    token_burst=app.config['ADMISSION_TOKEN_BURST'],
+    token_concurrency=app.config['ADMISSION_TOKEN_CONCURRENCY']
+)
+
+def admission_rejected_response(error):
+    """Turn a rejected submission into a 429 telling the client when to retry"""
+    response = jsonify({"error": str(error), "reason": error.reason})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 429
+
+# Background grading for async submissions; the semaphore bounds queued plus running jobs
+grading_executor = ThreadPoolExecutor(max_workers=app.config['GRADING_WORKERS'], thread_name_prefix='grading')
+grading_slots = threading.BoundedSemaphore(app.config['GRADING_QUEUE_SIZE'])
+
+# Wakes /jobs/<id>/events streams when a job in this process changes state
+job_broker = EventBroker()
+
+def run_grading_job(job_id, upload, filename, assignment, dredd_slug, anon_student, student_token):
+    """Grade one queued submission on a worker thread and store the outcome on its job"""
+    try:
+        with app.app_context():
+            job = db.session.get(GradingJob, job_id)
+            job.status = 'running'
+            db.session.commit()
+            job_broker.publish('job', {'id': job_id})
+
+            try:
+                body, http_status = grade_submission(upload, filename, assignment, dredd_slug, anon_student)
+                status = 'done'
+            except Exception as e:
+                db.session.rollback()
+                print(f"Grading job {job_id} failed: {e}")
+                body, http_status = {"error": str(e)}, 500
+                status = 'error'
+
+            # The job may have been deleted while it ran (e.g. by a semester reset)
+            job = db.session.get(GradingJob, job_id)
+            if job is not None:
+                job.status = status
+                job.http_status = http_status
+                job.result = json.dumps(body)
+                job.finished_at = datetime.now(timezone.utc)
+                db.session.commit()
+            db.session.remove()
+            job_broker.publish('job', {'id': job_id})
+    finally:
+        grading_slots.release()
+        admission.release_token(student_token)
+        upload.close()
+
+def enqueue_grading_job(upload, filename, assignment, dredd_slug, anon_student, student_token):
+    """
+    Record a queued GradingJob and hand it to the worker pool.
+
+    The worker releases the token's admission when the job finishes.
+
+    Returns:
+        GradingJob: The new job, or None if the queue is full (the upload is then closed)
+    """
+    if not grading_slots.acquire(blocking=False):
+        upload.close()
+        return None
+
+    try:
+        # Finished jobs are only kept long enough for their clients to collect them
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=app.config['GRADING_JOB_RETENTION_HOURS'])
+        GradingJob.query.filter(GradingJob.finished_at < cutoff.replace(tzinfo=None)).delete()
+
+        job = GradingJob(id=secrets.token_hex(16), student_id=anon_student, assignment=assignment)
+        db.session.add(job)
+        db.session.commit()
+
+        grading_executor.submit(run_grading_job, job.id, upload, filename, assignment, dredd_slug, anon_student,
+                                student_token)
+    except Exception:
+        grading_slots.release()
+        upload.close()
+        raise
+
+    return job
+
+def job_status_data(job):
+    """Return the client-facing view of a grading job"""
+    data = {
+        'id': job.id,
+        'status': job.status,
+        'assignment': job.assignment,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
+    if job.result is not None:
+        data['http_status'] = job.http_status
+        data['result'] = json.loads(job.result)
+    return data
+
 @app.route('/code/<assignment>', methods=['POST'])
 def proxy_code(assignment):
-    """Proxy code submissions to Dredd and record metadata"""
+    """Proxy code submissions to Dredd and record metadata.
+
+    Clients that send X-Async-Grading: 1 get a 202 with a job id right away
+    and collect the result from /jobs/<id> or /jobs/<id>/events.
+
+    Submissions over their token's rate or concurrency limit, or arriving
+    while the grading queue is full, get a 429 with a Retry-After header.
+    """
     try:
         # Check if the assignment is accepting submissions
         assignment_record = Assignment.query.filter_by(name=assignment).first()
@@ -983,101 +1822,114 @@ def proxy_code(assignment):
 
         anon_student = get_student(student_token).anonymous_id
 
-        # Get the source file from the request
-        source_file = request.files['source']
+        # Per-token rate and concurrency limits are checked before any work is done
+        try:
+            admission.admit_token(student_token)
+        except AdmissionRejected as e:
+            return admission_rejected_response(e)
 
-        # Create a temporary file with the same extension as the uploaded file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=Path(source_file.filename).suffix)
+        handed_off = False
         try:
+            # Get the source file from the request
+            source_file = request.files['source']
+
             # Optionally normalize indentation for editor submissions on Python files
             should_normalize = request.headers.get('X-Normalize-Indentation', '').lower() in {'1', 'true', 'yes'}
-            filename = Path(source_file.filename or "").name
-            ext = Path(filename).suffix.lower()
-
-            if should_normalize and ext == '.py':
-                # Read, normalize, and write back as UTF-8 text
-                raw = source_file.read()
-                try:
-                    text = raw.decode('utf-8')
-                except UnicodeDecodeError:
-                    # Fallback to latin-1 to preserve bytes if needed
-                    text = raw.decode('latin-1')
-                normalized = normalize_python_indentation(text, tab_size=4, align_to=4)
-                with open(temp_file.name, 'w', encoding='utf-8', newline='\n') as out:
-                    out.write(normalized)
-                temp_file.close()
-            else:
-                # Save the uploaded file to the temporary file as-is
-                source_file.save(temp_file.name)
-                temp_file.close()
-
-            # Run the linting process
-            lint_errors, lint_command, lines_of_code = run_lint(temp_file.name)
 
-            if int(lint_errors) < 0:
-                os.unlink(temp_file.name)
-                return jsonify({"ERROR": "Filetype not recognized for linting - please contact the instructor"}), 400
+            if request.headers.get('X-Async-Grading', '').lower() in {'1', 'true', 'yes'}:
+                upload = spool_upload(source_file, should_normalize)
+                job = enqueue_grading_job(upload, source_file.filename, assignment, dredd_slug, anon_student,
+                                          student_token)
+                if job is None:
+                    return admission_rejected_response(admission.reject(
+                        'job_queue_full', "Too many submissions are being graded, please try again shortly", 5))
+                # The job releases the token's admission when it finishes
+                handed_off = True
+
+                response = jsonify({
+                    'job_id': job.id,
+                    'status': job.status,
+                    'status_url': url_for('job_status', job_id=job.id),
+                    'events_url': url_for('job_events', job_id=job.id),
+                    'poll_interval': app.config['GRADING_JOB_POLL_INTERVAL']
+                })
+                response.headers['Location'] = url_for('job_status', job_id=job.id)
+                return response, 202
 
-            # Dredd Configuration - try two different URLs
-            DREDD_CODE_URL_1 = f'https://solomon.williamtheisen.com/{dredd_slug}/'
-            DREDD_CODE_URL_2 = f'https://dredd.h4x0r.space/{dredd_slug}/cse-30872-fa24/'
-            
-            dredd_result = None
-            response = None
-            
-            # Try the first URL
-            try:
-                print(f"Trying first URL: {DREDD_CODE_URL_1 + assignment}")
-                with open(temp_file.name, 'rb') as f:
-                    response = requests.post(DREDD_CODE_URL_1 + assignment,
-                                           files={'source': (source_file.filename, f)})
-                    dredd_result = response.json()
-                print("First URL succeeded")
-            except Exception as e:
-                print(f"First URL failed: {e}")
-                # Try the second URL
+            # Wait in the bounded queue for a grading slot before spooling the upload
+            with admission.grading_slot():
+                upload = spool_upload(source_file, should_normalize)
                 try:
-                    print(f"Trying second URL: {DREDD_CODE_URL_2 + assignment}")
-                    with open(temp_file.name, 'rb') as f:
-                        response = requests.post(DREDD_CODE_URL_2 + assignment,
-                                               files={'source': (source_file.filename, f)})
-                        dredd_result = response.json()
-                    print("Second URL succeeded")
-                except Exception as e2:
-                    print(f"Both URLs failed. First error: {e}, Second error: {e2}")
-                    return jsonify({"error": "Both submission endpoints are unavailable"}), 503
-
-            print(dredd_result)
-            # Parse metrics from Dredd's response
-            metrics = parse_dredd_response(dredd_result)
+                    body, http_status = grade_submission(upload, source_file.filename, assignment, dredd_slug,
+                                                         anon_student)
+                finally:
+                    upload.close()
+
+            return jsonify(body), http_status
+        except AdmissionRejected as e:
+            return admission_rejected_response(e)
         finally:
-            # Ensure the temporary file is deleted
-            os.unlink(temp_file.name)
-
-        # Normalize status to canonical Success/Failure for DB consistency
-        normalized_status = 'Success' if is_success_status(metrics['result']) else 'Failure'
-
-        # Record the submission
-        submission = Submission(
-            student_id=anon_student,
-            assignment=assignment,
-            status=normalized_status,
-            code_score=metrics['code_score'],
-            runtime=metrics['runtime'],
-            lint_errors=lint_errors,  # Use the lint score from the script
-            lines_of_code=lines_of_code
-        )
-        
-        db.session.add(submission)
-        db.session.commit()
-        
-        # Return Dredd's original response
-        return jsonify(dredd_result), response.status_code
-        
+            if not handed_off:
+                admission.release_token(student_token)
+
     except Exception as e:
         print(request.files['source'])
         return jsonify({"error": str(e)}), 500
 
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Report the status of a background grading job, and its result once finished"""
+    job = db.session.get(GradingJob, job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job_status_data(job))
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Stream a grading job's status changes as Server-Sent Events, ending with its result.
+
+    The stream sleeps until the worker announces a change on job_broker, and
+    re-reads the job on every keep-alive in case another process graded it.
+    """
+    if db.session.get(GradingJob, job_id) is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    keepalive = app.config['EVENTS_KEEPALIVE']
+
+    def stream():
+        # Subscribe before the first read so a change in between is not missed
+        subscriber = job_broker.subscribe()
+        last_status = None
+        try:
+            while True:
+                with app.app_context():
+                    job = db.session.get(GradingJob, job_id)
+                    data = job_status_data(job) if job is not None else None
+                    db.session.remove()
+
+                # Pruning or a semester reset may delete the job mid-stream
+                if data is None:
+                    yield format_sse('error', {"error": "Job not found"})
+                    return
+                if data['status'] in ('done', 'error'):
+                    yield format_sse('result', data)
+                    return
+                if data['status'] != last_status:
+                    last_status = data['status']
+                    yield format_sse('status', data)
+
+                try:
+                    # Every job's changes arrive here; wait for one that names this job
+                    while job_id not in subscriber.get(timeout=keepalive):
+                        pass
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+        finally:
+            job_broker.unsubscribe(subscriber)
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/online_editor', methods=['GET'])
 @app.route('/online_editor/<path:assignment>', methods=['GET'])
 def online_editor(assignment=None):
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Shared ranking functions for leaderboard scoring
+
+This module ranks the latest submissions for an assignment by runtime,
+lint errors and submission time in a single pass, and combines those
+ranks into the weighted leaderboard score.
+"""
+
+
+def rank_map(values):
+    """
+    Map each distinct value to its rank in ascending order.
+
+    Tied values share the rank of their first occurrence in the sorted list,
+    i.e. the number of values strictly smaller than them.
+
+    Args:
+        values (iterable): Values to rank
+
+    Returns:
+        dict: value -> zero-based rank
+    """
+    ranks = {}
+    for index, value in enumerate(sorted(values)):
+        ranks.setdefault(value, index)
+    return ranks
+
+
+def rank_score(rank, count):
+    """Assign a score between 0 and 1 based on rank"""
+    if count == 1:
+        return 1.0
+    return 1 - (rank / (count - 1))
+
+
+def weighted_score(runtime_score, lint_score, time_score, code_score, assignment):
+    """Combine the per-metric scores into the leaderboard points for one assignment"""
+    score = (
+        0.4 * runtime_score +
+        0.3 * lint_score +
+        0.2 * time_score +
+        0.1 * code_score
+    )
+
+    if 'exercise' in assignment:
+        score *= 0.25
+
+    return score
+
+
+def rank_from_percent_rank(percent_rank, count):
+    """Convert an SQL PERCENT_RANK() value back into a zero-based rank"""
+    return round(percent_rank * (count - 1))
+
+
+def ranked_submission(submission, runtime_rank, time_rank, lint_rank, count, assignment):
+    """
+    Build the ranked entry for one submission from its zero-based ranks.
+
+    Args:
+        submission: The Submission row being ranked
+        runtime_rank (int): Rank by runtime among `count` submissions
+        time_rank (int): Rank by submission time among `count` submissions
+        lint_rank (int): Rank by lint errors among `count` submissions
+        count (int): Number of submissions ranked for the assignment
+        assignment (str): The assignment name (exercises are weighted lower)
+
+    Returns:
+        dict: The submission, its ranks, per-metric scores and weighted score
+    """
+    runtime_score = rank_score(runtime_rank, count)
+    time_score = rank_score(time_rank, count)
+    lint_score = rank_score(lint_rank, count)
+    code_score = submission.code_score / 100
+
+    return {
+        'submission': submission,
+        'runtime_rank': runtime_rank,
+        'time_rank': time_rank,
+        'lint_rank': lint_rank,
+        'runtime_score': runtime_score,
+        'time_score': time_score,
+        'lint_score': lint_score,
+        'code_score': code_score,
+        'weighted_score': weighted_score(runtime_score, lint_score, time_score, code_score, assignment)
+    }
+
+
+def rank_submissions(submissions, assignment):
+    """
+    Rank the latest submissions for a single assignment against each other.
+
+    Args:
+        submissions (list): Latest Submission rows for the assignment
+        assignment (str): The assignment name (exercises are weighted lower)
+
+    Returns:
+        list: One dict per submission, in input order, with the submission,
+              its zero-based ranks, per-metric scores and weighted score
+    """
+    count = len(submissions)
+    runtime_ranks = rank_map(s.runtime for s in submissions)
+    time_ranks = rank_map(s.submission_time.timestamp() for s in submissions)
+    lint_ranks = rank_map(s.lint_errors for s in submissions)
+
+    return [
+        ranked_submission(
+            submission,
+            runtime_ranks[submission.runtime],
+            time_ranks[submission.submission_time.timestamp()],
+            lint_ranks[submission.lint_errors],
+            count,
+            assignment
+        )
+        for submission in submissions
+    ]
@@ -0,0 +1,11 @@
+from pc_flask_middleware import app, rebuild_daily_submission_stats
+
+
+def rebuild():
+    with app.app_context():
+        count = rebuild_daily_submission_stats()
+    print(f"Rebuilt submission counts for {count} days.")
+
+
+if __name__ == '__main__':
+    rebuild()
@@ -0,0 +1,11 @@
+from pc_flask_middleware import app, rebuild_latest_submissions
+
+
+def rebuild():
+    with app.app_context():
+        count = rebuild_latest_submissions()
+    print(f"Rebuilt {count} latest submission entries.")
+
+
+if __name__ == '__main__':
+    rebuild()
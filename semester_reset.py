@@ -24,7 +24,7 @@ import csv
 import secrets
 import os
 from datetime import datetime
-from pc_flask_middleware import db, Student, Submission, Assignment, AdminToken
+from pc_flask_middleware import db, Student, Submission, Assignment, AdminToken, LatestSubmission, DailySubmissionStats, GradingJob
 
 def generate_secret_token():
     """Generate a secure token"""
@@ -135,22 +135,22 @@ def backup_database(backup_dir):
     return stats, backup_path
 
 def get_top_students():
-    """Get the top 3 students from the current semester for historic preservation"""
-    from calculate_performance_data import get_top_students_with_performance
-    
-    # Get top students with performance data calculated from submissions
-    top_students_data = get_top_students_with_performance()
+    """Get the top 3 students from the current semester for historic preservation
     
-    # Extract just the student objects
-    top_students = [data['student'] for data in top_students_data]
+    Returns:
+        list: Dictionaries with the 'student' object and its 'performance' data
+    """
+    from calculate_performance_data import get_top_students_with_performance
     
-    return top_students
+    # Get top students with performance data calculated from submissions in one batch
+    return get_top_students_with_performance()
 
 def preserve_historic_students(top_students, historic_semester):
     """Preserve top 3 students as historic entries with their performance data
     
     Args:
-        top_students: List of top students to preserve
+        top_students: List of top students to preserve, each a dict with the
+                      'student' object and its 'performance' data
         historic_semester: The semester these students are from (will become their historic semester)
     """
     if not top_students:
@@ -159,11 +159,11 @@ def preserve_historic_students(top_students, historic_semester):
     
     print(f"Preserving top {len(top_students)} students as historic entries...")
     
-    # Import the HistoricStudentPerformance model and performance calculation
+    # Import the HistoricStudentPerformance model
     from pc_flask_middleware import HistoricStudentPerformance
-    from calculate_performance_data import calculate_student_performance_data
     
-    for i, student in enumerate(top_students, 1):
+    for i, top_student in enumerate(top_students, 1):
+        student = top_student['student']
         # Mark as historic (debug=True) and preserve original semester
         student.debug = True
         # Keep the student's original semester, don't overwrite it
@@ -172,11 +172,10 @@ def preserve_historic_students(top_students, historic_semester):
         
         # Update anonymous_id to include historic tag
         historic_id = f"Historic{i}_{student.anonymous_id}"
-        original_anonymous_id = student.anonymous_id
         student.anonymous_id = historic_id
         
-        # Calculate performance data directly from submissions
-        performance_data = calculate_student_performance_data(original_anonymous_id)
+        # Performance data was already calculated from submissions when ranking
+        performance_data = top_student['performance']
         
         # Save performance data to HistoricStudentPerformance table
         if performance_data:
@@ -218,8 +217,11 @@ def clear_all_tables():
     print(f"  - Assignments: {assignment_count}")
     print()
     
-    # Clear all submissions
+    # Clear all submissions (and the latest-submission index and daily counts derived from them)
     print("Clearing all submissions...")
+    LatestSubmission.query.delete()
+    DailySubmissionStats.query.delete()
+    GradingJob.query.delete()
     Submission.query.delete()
     
     # Clear all assignments
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+SQLite connection profile shared by the web app and the CLI scripts
+
+Every connection to the submissions database runs the same PRAGMAs when it
+is opened:
+
+    journal_mode=WAL      readers never wait for a writer and vice versa
+    synchronous=NORMAL    safe with WAL and avoids an fsync on every commit
+    busy_timeout          writers wait for the lock instead of failing with
+                          "database is locked"
+    cache_size            page cache per connection (negative means KiB)
+    mmap_size             bytes of the file read through memory mapping
+
+Each value can be overridden with an environment variable of the same name
+prefixed with SQLITE_ (e.g. SQLITE_BUSY_TIMEOUT=10000). Setting one to an
+empty string skips that PRAGMA and keeps SQLite's default.
+"""
+
+import os
+import sqlite3
+
+# PRAGMA name -> default value, applied in this order
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': '5000',
+    'cache_size': '-20000',
+    'mmap_size': '268435456',
+}
+
+
+def sqlite_pragmas():
+    """Return the PRAGMAs to apply, with environment overrides, as (name, value) pairs"""
+    pragmas = []
+    for name, default in DEFAULT_PRAGMAS.items():
+        value = os.environ.get(f"SQLITE_{name.upper()}", default).strip()
+        if value:
+            pragmas.append((name, value))
+    return pragmas
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas=None):
+    """Run the PRAGMA profile on a freshly opened sqlite3 connection"""
+    if pragmas is None:
+        pragmas = sqlite_pragmas()
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def connect(database_path):
+    """Open a raw sqlite3 connection with the PRAGMA profile applied"""
+    conn = sqlite3.connect(database_path)
+    apply_sqlite_pragmas(conn)
+    return conn
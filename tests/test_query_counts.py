@@ -0,0 +1,94 @@
+"""
+The leaderboard, ticker and assignment pages must run a fixed number of
+queries no matter how many students there are.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ASSIGNMENTS = ['challenge01', 'exercise01']
+PATHS = ['/leaderboard_data', '/recent_submissions', '/assignment/challenge01']
+
+
+@pytest.fixture(scope='module')
+def app_module(tmp_path_factory):
+    db_path = tmp_path_factory.mktemp('db') / 'submissions.db'
+    os.environ['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_path}"
+    import pc_flask_middleware
+    return pc_flask_middleware
+
+
+def add_students(m, start, count):
+    """Add `count` students, a third of them historic (debug with a semester), each with two submissions per assignment"""
+    now = datetime(2026, 10, 1)
+    for i in range(start, start + count):
+        anonymous_id = f"s{i:07d}"
+        historic = i % 3 == 0
+        m.db.session.add(m.Student(
+            net_id=f"net{i}",
+            anonymous_id=anonymous_id,
+            secret_token=f"token{i}",
+            debug=historic,
+            semester='Spring2026' if historic else None
+        ))
+        if historic:
+            m.db.session.add(m.HistoricStudentPerformance(student_anonymous_id=anonymous_id, semester='Spring2026'))
+        for assignment in ASSIGNMENTS:
+            for attempt in range(2):
+                m.db.session.add(m.Submission(
+                    student_id=anonymous_id,
+                    assignment=assignment,
+                    status='Success' if attempt else 'Failure',
+                    code_score=50.0 + attempt * 50,
+                    runtime=0.1 + (i % 7) / 10,
+                    lint_errors=float(i % 5),
+                    lines_of_code=10 + i % 4,
+                    submission_time=now + timedelta(minutes=i * 2 + attempt)
+                ))
+    m.db.session.commit()
+    m.rebuild_latest_submissions()
+    m.db.session.commit()
+
+
+def query_counts(m):
+    """Return the number of SQL statements each page runs, with every cache invalidated"""
+    counts = {}
+
+    def count(*args):
+        counts[path] += 1
+
+    with m.app.app_context():
+        engine = m.db.engine
+    client = m.app.test_client()
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        for path in PATHS:
+            m.bump_data_version()
+            counts[path] = 0
+            response = client.get(path)
+            assert response.status_code == 200, path
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    return counts
+
+
+def test_query_count_stays_flat_as_students_grow(app_module):
+    m = app_module
+    with m.app.app_context():
+        for name in ASSIGNMENTS:
+            m.db.session.add(m.Assignment(name=name, deadline=datetime(2026, 12, 1)))
+        add_students(m, 0, 10)
+    small = query_counts(m)
+
+    with m.app.app_context():
+        add_students(m, 10, 30)
+    large = query_counts(m)
+
+    assert all(small.values())
+    assert small == large